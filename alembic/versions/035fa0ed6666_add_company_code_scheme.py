@@ -0,0 +1,31 @@
+"""add company code scheme
+
+Revision ID: 035fa0ed6666
+Revises: 2b57d2886100
+Create Date: 2026-10-17 16:41:08.226951
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '035fa0ed6666'
+down_revision: Union[str, None] = '2b57d2886100'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+code_scheme = postgresql.ENUM('plain', 'hmac', name='code_scheme')
+
+
+def upgrade() -> None:
+    code_scheme.create(op.get_bind())
+    op.add_column('company', sa.Column('code_scheme', code_scheme, server_default='plain', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('company', 'code_scheme')
+    code_scheme.drop(op.get_bind())
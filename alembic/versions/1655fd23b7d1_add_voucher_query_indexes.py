@@ -0,0 +1,36 @@
+"""add voucher query indexes
+
+Revision ID: 1655fd23b7d1
+Revises: fa2fdfea4024
+Create Date: 2026-10-17 11:02:17.530841
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1655fd23b7d1'
+down_revision: Union[str, None] = 'fa2fdfea4024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_voucher_company_status', 'voucher', ['company_id', 'status'], unique=False)
+    op.create_index('ix_voucher_company_created', 'voucher', ['company_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_voucher_created', 'voucher', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_voucher_active_company_created', 'voucher', ['company_id', 'created_at'], unique=False, postgresql_where=sa.text("status = 'active'"))
+    op.create_index(op.f('ix_voucher_used_by'), 'voucher', ['used_by'], unique=False)
+    op.create_index(op.f('ix_attendant_branch_id'), 'attendant', ['branch_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attendant_branch_id'), table_name='attendant')
+    op.drop_index(op.f('ix_voucher_used_by'), table_name='voucher')
+    op.drop_index('ix_voucher_active_company_created', table_name='voucher', postgresql_where=sa.text("status = 'active'"))
+    op.drop_index('ix_voucher_created', table_name='voucher')
+    op.drop_index('ix_voucher_company_created', table_name='voucher')
+    op.drop_index('ix_voucher_company_status', table_name='voucher')
@@ -0,0 +1,38 @@
+"""add voucher counters
+
+Revision ID: 223ce7101c69
+Revises: 303770c40c03
+Create Date: 2026-10-17 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '223ce7101c69'
+down_revision: Union[str, None] = '303770c40c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('voucher_counters',
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.PrimaryKeyConstraint('company_id', 'status')
+    )
+    # Seed from the existing vouchers; afterwards the API keeps it in step
+    op.execute(
+        "INSERT INTO voucher_counters (company_id, status, count) "
+        "SELECT company_id, coalesce(status, 'active'), count(*) FROM voucher "
+        "GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('voucher_counters')
@@ -0,0 +1,51 @@
+"""voucher code suffix int
+
+Revision ID: 2b57d2886100
+Revises: 5cfb840b27cc
+Create Date: 2026-10-17 15:10:33.417260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b57d2886100'
+down_revision: Union[str, None] = '5cfb840b27cc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUFFIX_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+SUFFIX_WIDTH = 6
+
+# Base-36 value of the last SUFFIX_WIDTH characters of voucher.code
+SUFFIX_INT_SQL = " + ".join(
+    f"(strpos('{SUFFIX_ALPHABET}', substr(right(code, {SUFFIX_WIDTH}), {position + 1}, 1)) - 1)::bigint"
+    f" * {36 ** (SUFFIX_WIDTH - 1 - position)}"
+    for position in range(SUFFIX_WIDTH)
+)
+
+
+def upgrade() -> None:
+    # Lookups route on the acronym, so every code must be <acronym>-<6 base-36 chars>
+    malformed = op.get_bind().scalar(sa.text(
+        "SELECT count(*) FROM voucher JOIN company ON company.id = voucher.company_id "
+        f"WHERE voucher.code !~ '^.+-[0-9A-Z]{{{SUFFIX_WIDTH}}}$' "
+        f"OR left(voucher.code, -{SUFFIX_WIDTH + 1}) <> company.acronym"
+    ))
+    if malformed:
+        raise RuntimeError(f"{malformed} voucher codes don't match their company's acronym-suffix format")
+
+    op.add_column('voucher', sa.Column('suffix_int', sa.BigInteger(), nullable=True))
+    op.execute(f"UPDATE voucher SET suffix_int = {SUFFIX_INT_SQL}")
+    op.alter_column('voucher', 'suffix_int', existing_type=sa.BigInteger(), nullable=False)
+    op.create_index('ux_voucher_company_suffix', 'voucher', ['company_id', 'suffix_int'], unique=True)
+    op.drop_constraint('voucher_code_key', 'voucher', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('voucher_code_key', 'voucher', ['code'])
+    op.drop_index('ux_voucher_company_suffix', table_name='voucher')
+    op.drop_column('voucher', 'suffix_int')
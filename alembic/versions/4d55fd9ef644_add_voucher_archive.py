@@ -0,0 +1,46 @@
+"""add voucher archive
+
+Revision ID: 4d55fd9ef644
+Revises: 035fa0ed6666
+Create Date: 2026-10-17 18:05:49.671302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d55fd9ef644'
+down_revision: Union[str, None] = '035fa0ed6666'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('voucher_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('code', sa.String(length=20), nullable=False),
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('suffix_int', sa.BigInteger(), nullable=False),
+    sa.Column('status', postgresql.ENUM('active', 'used', 'invalid', name='voucher_status', create_type=False), nullable=False),
+    sa.Column('used_by', sa.UUID(), nullable=True),
+    sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('batch_id', sa.UUID(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voucher_archive_batch_id'), 'voucher_archive', ['batch_id'], unique=False)
+    op.create_index('ux_voucher_archive_company_suffix', 'voucher_archive', ['company_id', 'suffix_int'], unique=True)
+    op.create_index('ix_voucher_archivable', 'voucher', [sa.text('coalesce(used_at, created_at)')], unique=False, postgresql_where=sa.text("status != 'active'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_voucher_archivable', table_name='voucher', postgresql_where=sa.text("status != 'active'"))
+    op.drop_index('ux_voucher_archive_company_suffix', table_name='voucher_archive')
+    op.drop_index(op.f('ix_voucher_archive_batch_id'), table_name='voucher_archive')
+    op.drop_table('voucher_archive')
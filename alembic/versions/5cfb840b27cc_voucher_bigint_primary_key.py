@@ -0,0 +1,51 @@
+"""voucher bigint primary key
+
+Revision ID: 5cfb840b27cc
+Revises: b4fc32d59011
+Create Date: 2026-10-17 13:48:05.902361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5cfb840b27cc'
+down_revision: Union[str, None] = 'b4fc32d59011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Opt-in: rewriting the primary key of a large voucher table is slow, and the
+# extra key only pays off for deployments that need it (see VOUCHER_BIGINT_KEY)
+
+
+def upgrade() -> None:
+    if not settings.VOUCHER_BIGINT_KEY:
+        return
+    op.drop_index('ix_voucher_created', table_name='voucher')
+    op.drop_index('ix_voucher_company_created', table_name='voucher')
+    # Existing rows are numbered from the identity sequence as the column is added
+    op.add_column('voucher', sa.Column('pk', sa.BigInteger(), sa.Identity(always=False), nullable=False))
+    op.drop_constraint('voucher_pkey', 'voucher', type_='primary')
+    op.create_primary_key('voucher_pkey', 'voucher', ['pk'])
+    op.create_unique_constraint('voucher_id_key', 'voucher', ['id'])
+    op.create_index('ix_voucher_company_created', 'voucher', ['company_id', sa.text('created_at DESC'), sa.text('pk DESC')], unique=False)
+    op.create_index('ix_voucher_created', 'voucher', [sa.text('created_at DESC'), sa.text('pk DESC')], unique=False)
+
+
+def downgrade() -> None:
+    if not settings.VOUCHER_BIGINT_KEY:
+        return
+    op.drop_index('ix_voucher_created', table_name='voucher')
+    op.drop_index('ix_voucher_company_created', table_name='voucher')
+    op.drop_constraint('voucher_id_key', 'voucher', type_='unique')
+    op.drop_constraint('voucher_pkey', 'voucher', type_='primary')
+    op.create_primary_key('voucher_pkey', 'voucher', ['id'])
+    op.drop_column('voucher', 'pk')
+    op.create_index('ix_voucher_company_created', 'voucher', ['company_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_voucher_created', 'voucher', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
@@ -0,0 +1,45 @@
+"""add redemption rollup
+
+Revision ID: 96e0e6186f9c
+Revises: 4d55fd9ef644
+Create Date: 2026-10-17 19:22:14.840519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '96e0e6186f9c'
+down_revision: Union[str, None] = '4d55fd9ef644'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('redemption_rollup',
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('hour', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('branch_id', sa.UUID(), nullable=False),
+    sa.Column('attendant_id', sa.UUID(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['attendant_id'], ['attendant.id'], ),
+    sa.ForeignKeyConstraint(['branch_id'], ['branch.id'], ),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.PrimaryKeyConstraint('company_id', 'hour', 'branch_id', 'attendant_id')
+    )
+    # Seed from existing redemptions, live and archived; the API keeps it in step
+    op.execute(
+        "INSERT INTO redemption_rollup (company_id, hour, branch_id, attendant_id, count) "
+        "SELECT v.company_id, date_trunc('hour', v.used_at, 'UTC'), a.branch_id, v.used_by, count(*) "
+        "FROM (SELECT company_id, used_by, used_at FROM voucher WHERE used_at IS NOT NULL "
+        "UNION ALL SELECT company_id, used_by, used_at FROM voucher_archive WHERE used_at IS NOT NULL) v "
+        "JOIN attendant a ON a.id = v.used_by "
+        "GROUP BY 1, 2, 3, 4"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('redemption_rollup')
@@ -0,0 +1,57 @@
+"""voucher status enum
+
+Revision ID: b4fc32d59011
+Revises: 1655fd23b7d1
+Create Date: 2026-10-17 13:26:50.114872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4fc32d59011'
+down_revision: Union[str, None] = '1655fd23b7d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+voucher_status = postgresql.ENUM('active', 'used', 'invalid', name='voucher_status')
+
+
+def upgrade() -> None:
+    # The partial index predicate compares against text; rebuild it on the enum
+    op.drop_index('ix_voucher_active_company_created', table_name='voucher', postgresql_where=sa.text("status = 'active'"))
+    op.execute("UPDATE voucher SET status = 'active' WHERE status IS NULL")
+    voucher_status.create(op.get_bind())
+    op.alter_column('voucher', 'status',
+               existing_type=sa.Text(),
+               type_=voucher_status,
+               postgresql_using='status::voucher_status',
+               nullable=False,
+               server_default='active')
+    op.alter_column('voucher_counters', 'status',
+               existing_type=sa.Text(),
+               type_=voucher_status,
+               postgresql_using='status::voucher_status',
+               existing_nullable=False)
+    op.create_index('ix_voucher_active_company_created', 'voucher', ['company_id', 'created_at'], unique=False, postgresql_where=sa.text("status = 'active'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_voucher_active_company_created', table_name='voucher', postgresql_where=sa.text("status = 'active'"))
+    op.alter_column('voucher_counters', 'status',
+               existing_type=voucher_status,
+               type_=sa.Text(),
+               postgresql_using='status::text',
+               existing_nullable=False)
+    op.alter_column('voucher', 'status',
+               existing_type=voucher_status,
+               type_=sa.Text(),
+               postgresql_using='status::text',
+               nullable=True,
+               server_default=None)
+    voucher_status.drop(op.get_bind())
+    op.create_index('ix_voucher_active_company_created', 'voucher', ['company_id', 'created_at'], unique=False, postgresql_where=sa.text("status = 'active'"))
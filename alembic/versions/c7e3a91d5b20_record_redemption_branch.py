@@ -0,0 +1,37 @@
+"""record redemption branch
+
+Revision ID: c7e3a91d5b20
+Revises: 96e0e6186f9c
+Create Date: 2026-10-17 21:05:37.412806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a91d5b20'
+down_revision: Union[str, None] = '96e0e6186f9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('voucher', sa.Column('used_branch_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('voucher_used_branch_id_fkey', 'voucher', 'branch', ['used_branch_id'], ['id'])
+    op.add_column('voucher_archive', sa.Column('used_branch_id', sa.UUID(), nullable=True))
+    # Earlier redemptions didn't record a branch; the attendant's current one
+    # is what the rollups were seeded with
+    for table in ('voucher', 'voucher_archive'):
+        op.execute(
+            f"UPDATE {table} v SET used_branch_id = a.branch_id "
+            "FROM attendant a WHERE a.id = v.used_by AND v.used_at IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('voucher_archive', 'used_branch_id')
+    op.drop_constraint('voucher_used_branch_id_fkey', 'voucher', type_='foreignkey')
+    op.drop_column('voucher', 'used_branch_id')
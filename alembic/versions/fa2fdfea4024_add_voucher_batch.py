@@ -0,0 +1,41 @@
+"""add voucher batch
+
+Revision ID: fa2fdfea4024
+Revises: 223ce7101c69
+Create Date: 2026-10-17 11:40:07.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fa2fdfea4024'
+down_revision: Union[str, None] = '223ce7101c69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('voucher_batch',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('company_id', sa.UUID(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['admin.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('voucher', sa.Column('batch_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('voucher_batch_id_fkey', 'voucher', 'voucher_batch', ['batch_id'], ['id'])
+    op.create_index(op.f('ix_voucher_batch_id'), 'voucher', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_voucher_batch_id'), table_name='voucher')
+    op.drop_constraint('voucher_batch_id_fkey', 'voucher', type_='foreignkey')
+    op.drop_column('voucher', 'batch_id')
+    op.drop_table('voucher_batch')
@@ -1,16 +1,19 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import create_access_token, get_current_admin, get_password_hash, verify_password
+from app.core.security import create_access_token, get_current_admin, get_password_hash, verify_and_update_password
 from app.models import models
 from app.schemas import schemas
 from typing import List
 from uuid import UUID
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/login", status_code=200)
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Authenticate admin user and generate access token.
 
@@ -31,25 +34,36 @@ async def login(request: Request, db: Session = Depends(get_db)):
         email = body.get("email")
         passcode = body.get("passcode")
         
-        print(f"Login attempt for: {email}")  # Debug log
-        
-        admin = db.query(models.Admin).filter(models.Admin.email == email).first()
-        if not admin or not verify_password(passcode, admin.passcode):
+        admin = await db.scalar(select(models.Admin).where(models.Admin.email == email))
+        if not admin:
+            logger.info("Admin login rejected", extra={"email": email, "reason": "unknown email"})
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        # Return the connection before queueing for a hash worker, so a login
+        # storm can't exhaust the pool and stall verify and use
+        await db.commit()
+        valid, new_hash = await verify_and_update_password(passcode, admin.passcode)
+        if not valid:
+            logger.info("Admin login rejected", extra={"email": email, "reason": "wrong passcode"})
             raise HTTPException(status_code=401, detail="Invalid credentials")
+        if new_hash:
+            admin.passcode = new_hash
+            await db.commit()
         
         access_token = create_access_token(data={"sub": admin.email})
-        print(f"Generated token for {email}: {access_token}")  # Debug log
+        logger.info("Admin logged in", extra={"email": email})
         
         return {
             "access_token": access_token,
             "token_type": "bearer"
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.exception("Admin login failed")
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/create", response_model=schemas.Admin)
-async def create_admin(request: Request, db: Session = Depends(get_db)):
+async def create_admin(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Create a new admin account.
 
@@ -71,21 +85,21 @@ async def create_admin(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email and passcode required")
     
     # Check if admin already exists
-    if db.query(models.Admin).filter(models.Admin.email == email).first():
+    if await db.scalar(select(models.Admin).where(models.Admin.email == email)):
         raise HTTPException(status_code=400, detail="Email already registered")
         
     db_admin = models.Admin(
         email=email,
-        passcode=get_password_hash(passcode)
+        passcode=await get_password_hash(passcode)
     )
     db.add(db_admin)
-    db.commit()
-    db.refresh(db_admin)
+    await db.commit()
+    await db.refresh(db_admin)
     return db_admin
 
 @router.get("/", response_model=List[schemas.Admin])
 async def get_admins(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -96,16 +110,16 @@ async def get_admins(
 
     Requires admin authentication.
     """
-    admins = db.query(models.Admin).all()
+    admins = (await db.scalars(select(models.Admin))).all()
     return admins
 
 @router.get("/{admin_id}", response_model=schemas.Admin)
 async def get_admin(
     admin_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
+    admin = await db.scalar(select(models.Admin).where(models.Admin.id == admin_id))
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     return admin
\ No newline at end of file
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import get_current_admin, get_password_hash, verify_password, create_access_token
+from app.core.security import get_current_admin, get_password_hash, verify_and_update_password, create_access_token
 from app.models import models
 from app.schemas import schemas
 from typing import List
@@ -10,7 +11,7 @@ from uuid import UUID
 router = APIRouter()
 
 @router.post("/login")
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Authenticate attendant and generate access token.
 
@@ -33,9 +34,18 @@ async def login(request: Request, db: Session = Depends(get_db)):
     if not email or not passcode:
         raise HTTPException(status_code=400, detail="Email and passcode required")
     
-    attendant = db.query(models.Attendant).filter(models.Attendant.email == email).first()
-    if not attendant or not verify_password(passcode, attendant.passcode):
+    attendant = await db.scalar(select(models.Attendant).where(models.Attendant.email == email))
+    if not attendant:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    # Return the connection before queueing for a hash worker, so a login
+    # storm can't exhaust the pool and stall verify and use
+    await db.commit()
+    valid, new_hash = await verify_and_update_password(passcode, attendant.passcode)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        attendant.passcode = new_hash
+        await db.commit()
     
     access_token = create_access_token(data={
         "sub": attendant.email,
@@ -51,16 +61,16 @@ async def login(request: Request, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[schemas.Attendant])
 async def get_attendants(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    attendants = db.query(models.Attendant).all()
+    attendants = (await db.scalars(select(models.Attendant))).all()
     return attendants
 
 @router.post("/create", response_model=schemas.Attendant)
 async def create_attendant(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -94,32 +104,32 @@ async def create_attendant(
         raise HTTPException(status_code=400, detail="Invalid branch ID format")
     
     # Check if attendant already exists
-    if db.query(models.Attendant).filter(models.Attendant.email == email).first():
+    if await db.scalar(select(models.Attendant).where(models.Attendant.email == email)):
         raise HTTPException(status_code=400, detail="Attendant with this email already exists")
     
     # Check if branch exists
-    branch = db.query(models.Branch).filter(models.Branch.id == branch_uuid).first()
+    branch = await db.scalar(select(models.Branch).where(models.Branch.id == branch_uuid))
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
         
     db_attendant = models.Attendant(
         email=email,
-        passcode=get_password_hash(passcode),
+        passcode=await get_password_hash(passcode),
         branch_id=branch_uuid,
         created_by=current_admin.id
     )
     db.add(db_attendant)
-    db.commit()
-    db.refresh(db_attendant)
+    await db.commit()
+    await db.refresh(db_attendant)
     return db_attendant
 
 @router.get("/{attendant_id}", response_model=schemas.Attendant)
 async def get_attendant(
     attendant_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    attendant = db.query(models.Attendant).filter(models.Attendant.id == attendant_id).first()
+    attendant = await db.scalar(select(models.Attendant).where(models.Attendant.id == attendant_id))
     if not attendant:
         raise HTTPException(status_code=404, detail="Attendant not found")
     return attendant
@@ -127,7 +137,7 @@ async def get_attendant(
 @router.get("/branch/{branch_id}", response_model=List[schemas.Attendant])
 async def get_attendants_by_branch(
     branch_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -141,5 +151,7 @@ async def get_attendants_by_branch(
 
     Requires admin authentication.
     """
-    attendants = db.query(models.Attendant).filter(models.Attendant.branch_id == branch_id).all()
+    attendants = (await db.scalars(
+        select(models.Attendant).where(models.Attendant.branch_id == branch_id)
+    )).all()
     return attendants
\ No newline at end of file
@@ -0,0 +1,115 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.jobs import jobs
+from app.core.security import get_current_admin
+from app.models import models
+from app.schemas import schemas
+from app.utils.voucher_bulk import INVALIDATE, run_bulk_transition
+from app.utils.voucher_export import export_response, export_select
+from app.utils.voucher_stats import usage_percentage, voucher_count_columns
+from typing import Literal
+from uuid import UUID
+
+router = APIRouter()
+
+async def get_batch_or_404(db: AsyncSession, batch_id: UUID) -> models.VoucherBatch:
+    batch = await db.scalar(select(models.VoucherBatch).where(models.VoucherBatch.id == batch_id))
+    if not batch:
+        raise HTTPException(status_code=404, detail="Voucher batch not found")
+    return batch
+
+@router.get("/{batch_id}", response_model=schemas.VoucherBatch)
+async def get_batch(
+    batch_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    return await get_batch_or_404(db, batch_id)
+
+@router.get("/{batch_id}/stats")
+async def get_batch_stats(
+    batch_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Get voucher statistics for a single batch.
+
+    Returns:
+    - **total_vouchers**, **active_vouchers**, **used_vouchers**, **invalid_vouchers**
+    - **usage_percentage**: Share of the batch that has been redeemed
+
+    Counted in one pass over the batch's live and archived vouchers via
+    their batch_id indexes.
+    """
+    batch = await get_batch_or_404(db, batch_id)
+    statuses = union_all(
+        select(models.Voucher.status).where(models.Voucher.batch_id == batch.id),
+        select(models.VoucherArchive.status).where(models.VoucherArchive.batch_id == batch.id)
+    ).subquery()
+    stats = (await db.execute(select(*voucher_count_columns(statuses.c.status)))).one()
+    return {
+        "batch_id": str(batch.id),
+        "company_id": str(batch.company_id),
+        "created_at": batch.created_at,
+        "total_vouchers": stats.total,
+        "active_vouchers": stats.active,
+        "used_vouchers": stats.used,
+        "invalid_vouchers": stats.invalid,
+        "usage_percentage": usage_percentage(stats.used, stats.total)
+    }
+
+@router.get("/{batch_id}/export")
+async def export_batch(
+    batch_id: UUID,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Stream every voucher in the batch, archived ones included, as NDJSON
+    (default) or CSV.
+    """
+    batch = await get_batch_or_404(db, batch_id)
+    # Return the request's connection to the pool; the stream opens its own
+    # and can outlive the request by minutes
+    await db.commit()
+    stmt = export_select(lambda table: [table.batch_id == batch.id])
+    return export_response(stmt, export_format, f"batch-{batch.id}")
+
+@router.post("/{batch_id}/invalidate")
+async def invalidate_batch(
+    batch_id: UUID,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Invalidate every active or used voucher in the batch.
+
+    Parameters:
+    - **background** (query): Return immediately with a job id instead of
+      waiting; poll `GET /api/v1/voucher/jobs/{job_id}` for progress
+
+    Returns:
+    - Job record with **total**, **processed** and **affected** counts
+    """
+    batch = await get_batch_or_404(db, batch_id)
+    # The bulk job works in its own sessions; don't hold this connection idle
+    # in a transaction while it runs
+    await db.commit()
+    job = jobs.create(INVALIDATE.kind)
+
+    if background:
+        background_tasks.add_task(run_bulk_transition, job, INVALIDATE, batch_id=batch.id)
+        response.status_code = 202
+        return job.to_dict()
+
+    await run_bulk_transition(job, INVALIDATE, batch_id=batch.id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.to_dict()
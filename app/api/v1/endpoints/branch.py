@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import get_current_admin
 from app.models import models
@@ -11,7 +12,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Branch])
 async def get_branches(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -26,12 +27,12 @@ async def get_branches(
 
     Requires admin authentication.
     """
-    branches = db.query(models.Branch).all()
+    branches = (await db.scalars(select(models.Branch))).all()
     return branches
 
 async def create_branch(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -57,10 +58,10 @@ async def create_branch(
         raise HTTPException(status_code=400, detail="Name and location required")
     
     # Check if branch with same name and location exists
-    existing_branch = db.query(models.Branch).filter(
+    existing_branch = await db.scalar(select(models.Branch).where(
         models.Branch.name == name,
         models.Branch.location == location
-    ).first()
+    ))
     
     if existing_branch:
         raise HTTPException(
@@ -73,14 +74,14 @@ async def create_branch(
         location=location
     )
     db.add(db_branch)
-    db.commit()
-    db.refresh(db_branch)
+    await db.commit()
+    await db.refresh(db_branch)
     return db_branch
 
 @router.get("/{branch_id}", response_model=schemas.Branch)
 async def get_branch(
     branch_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -94,7 +95,7 @@ async def get_branch(
 
     Requires admin authentication.
     """
-    branch = db.query(models.Branch).filter(models.Branch.id == branch_id).first()
+    branch = await db.scalar(select(models.Branch).where(models.Branch.id == branch_id))
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
     return branch
@@ -103,10 +104,10 @@ async def get_branch(
 async def update_branch(
     branch_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    branch = db.query(models.Branch).filter(models.Branch.id == branch_id).first()
+    branch = await db.scalar(select(models.Branch).where(models.Branch.id == branch_id))
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
     
@@ -119,6 +120,6 @@ async def update_branch(
     if location:
         branch.location = location
         
-    db.commit()
-    db.refresh(branch)
+    await db.commit()
+    await db.refresh(branch)
     return branch
\ No newline at end of file
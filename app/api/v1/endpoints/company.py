@@ -1,17 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.query_counter import query_budget
+from app.core.responses import FastJSONResponse
 from app.core.security import get_current_admin
 from app.models import models
 from app.schemas import schemas
-from typing import List
+from app.utils.voucher_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, VoucherFilters, paginate_vouchers
+from app.utils.voucher_rows import voucher_row_dicts, voucher_rows_select
+from app.utils.voucher_stats import status_count_columns, usage_percentage
+from typing import List, Optional
 from uuid import UUID
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def parse_code_scheme(code_scheme: str) -> str:
+    if code_scheme not in {scheme.value for scheme in schemas.CodeScheme}:
+        raise HTTPException(status_code=400, detail="code_scheme must be plain or hmac")
+    if code_scheme == "hmac" and not settings.VOUCHER_CODE_SECRET:
+        raise HTTPException(status_code=400, detail="hmac code scheme requires VOUCHER_CODE_SECRET")
+    return code_scheme
 
 @router.get("/", response_model=List[schemas.Company])
 async def get_companies(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -27,19 +43,17 @@ async def get_companies(
     Requires admin authentication.
     """
     try:
-        # Add debug logging
-        print(f"Getting companies for admin: {current_admin.email}")
-        companies = db.query(models.Company).all()
+        companies = (await db.scalars(select(models.Company))).all()
         return companies
     except Exception as e:
-        print(f"Error getting companies: {str(e)}")
+        logger.exception("Error getting companies")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/create", response_model=schemas.Company)
 async def create_company(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -48,6 +62,9 @@ async def create_company(
     Parameters:
     - **name**: Company full name
     - **acronym**: Company acronym (used for voucher code generation)
+    - **code_scheme**: `plain` (default) or `hmac`; hmac codes end in two
+      check characters derived from a server key, so mistyped or forged
+      codes are rejected before any database lookup
 
     Returns:
     - Created company object
@@ -62,39 +79,85 @@ async def create_company(
 
     try:
         body = await request.json()
-        print(f"Creating company with data: {body}")  
-
         name = body.get("name")
         acronym = body.get("acronym")
         
         if not name or not acronym:
             raise HTTPException(status_code=400, detail="Name and acronym required")
+        code_scheme = parse_code_scheme(body.get("code_scheme", "plain"))
         
         # Check if company with acronym already exists
-        db_company = db.query(models.Company).filter(models.Company.acronym == acronym.upper()).first()
+        db_company = await db.scalar(
+            select(models.Company).where(models.Company.acronym == acronym.upper())
+        )
         if db_company:
             raise HTTPException(status_code=400, detail="Company with this acronym already exists")
             
         db_company = models.Company(
             name=name,
-            acronym=acronym.upper()
+            acronym=acronym.upper(),
+            code_scheme=code_scheme
         )
         db.add(db_company)
-        db.commit()
-        db.refresh(db_company)
+        await db.commit()
+        await db.refresh(db_company)
+        logger.info(
+            "Company created",
+            extra={"company_id": db_company.id, "acronym": db_company.acronym, "admin": current_admin.email}
+        )
         return db_company
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error creating company: {str(e)}")
+        logger.exception("Error creating company")
         raise HTTPException(status_code=500, detail=str(e))
     
 
+@router.get("/stats")
+async def get_companies_stats(
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Get voucher statistics for every company in one call.
+
+    Returns:
+    - List of per-company entries with **company_id**, **company_name**,
+      **company_acronym**, **total_vouchers**, **active_vouchers**,
+      **used_vouchers**, **invalid_vouchers** and **usage_percentage**
+
+    Read from the maintained voucher counters in a single query, so the
+    dashboard's company table needs one request instead of one per company.
+
+    Requires admin authentication.
+    """
+    rows = (await db.execute(
+        select(models.Company.id, models.Company.name, models.Company.acronym, *status_count_columns())
+        .outerjoin(models.VoucherCounter, models.VoucherCounter.company_id == models.Company.id)
+        .group_by(models.Company.id)
+        .order_by(models.Company.name)
+    )).all()
+    return [
+        {
+            "company_id": row.id,
+            "company_name": row.name,
+            "company_acronym": row.acronym,
+            "total_vouchers": row.total,
+            "active_vouchers": row.active,
+            "used_vouchers": row.used,
+            "invalid_vouchers": row.invalid,
+            "usage_percentage": usage_percentage(row.used, row.total)
+        }
+        for row in rows
+    ]
+
 @router.get("/{company_id}", response_model=schemas.Company)
 async def get_company(
     company_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
+    company = await db.scalar(select(models.Company).where(models.Company.id == company_id))
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
@@ -102,7 +165,7 @@ async def get_company(
 @router.get("/{company_id}/stats")
 async def get_company_stats(
     company_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -121,83 +184,105 @@ async def get_company_stats(
 
     Requires admin authentication.
     """
-    # Check if company exists
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
-    if not company:
+    # Company lookup and voucher counters in a single query
+    stats = (await db.execute(
+        select(models.Company.name, models.Company.acronym, *status_count_columns())
+        .outerjoin(models.VoucherCounter, models.VoucherCounter.company_id == models.Company.id)
+        .where(models.Company.id == company_id)
+        .group_by(models.Company.id)
+    )).first()
+    if not stats:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    total_vouchers = db.query(models.Voucher).filter(
-        models.Voucher.company_id == company_id
-    ).count()
-    
-    used_vouchers = db.query(models.Voucher).filter(
-        models.Voucher.company_id == company_id,
-        models.Voucher.status == "used"
-    ).count()
-    
     return {
-        "company_name": company.name,
-        "company_acronym": company.acronym,
-        "total_vouchers": total_vouchers,
-        "used_vouchers": used_vouchers,
-        "usage_percentage": (used_vouchers / total_vouchers * 100) if total_vouchers > 0 else 0
+        "company_name": stats.name,
+        "company_acronym": stats.acronym,
+        "total_vouchers": stats.total,
+        "used_vouchers": stats.used,
+        "usage_percentage": usage_percentage(stats.used, stats.total)
     }
 
 @router.put("/{company_id}", response_model=schemas.Company)
 async def update_company(
     company_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
+    company = await db.scalar(select(models.Company).where(models.Company.id == company_id))
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
     body = await request.json()
     name = body.get("name")
     acronym = body.get("acronym")
+    code_scheme = body.get("code_scheme")
     
     if name:
         company.name = name
-    if acronym:
+    if code_scheme:
+        # Only affects codes generated from now on; existing codes stay valid
+        company.code_scheme = parse_code_scheme(code_scheme)
+    if acronym and acronym.upper() != company.acronym:
+        # Issued codes carry the acronym and are routed by it
+        # Archived codes still verify, so they count as issued too
+        has_vouchers = await db.scalar(select(
+            exists().where(models.Voucher.company_id == company_id)
+            | exists().where(models.VoucherArchive.company_id == company_id)
+        ))
+        if has_vouchers:
+            raise HTTPException(
+                status_code=400,
+                detail="Cannot change the acronym of a company that has issued vouchers"
+            )
         # Check if new acronym already exists
-        existing = db.query(models.Company).filter(
+        existing = await db.scalar(select(models.Company).where(
             models.Company.acronym == acronym.upper(),
             models.Company.id != company_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(status_code=400, detail="Company with this acronym already exists")
         company.acronym = acronym.upper()
     
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
     return company
 
 
-@router.get("/{company_id}/vouchers", response_model=List[schemas.Voucher])
+@router.get(
+    "/{company_id}/vouchers",
+    response_model=schemas.VoucherPage,
+    response_class=FastJSONResponse,
+    dependencies=[Depends(query_budget(3))]
+)
 async def get_company_vouchers(
     company_id: UUID,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: VoucherFilters = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
+    """
+    List a company's vouchers one page at a time, newest first.
+
+    Accepts the same filters and cursor as `GET /api/v1/voucher/`.
+    """
     try:
-        # Debug logging
-        print(f"Fetching vouchers for company: {company_id}")
-        
         # Verify company exists
-        company = db.query(models.Company).filter(models.Company.id == company_id).first()
+        company = await db.scalar(select(models.Company).where(models.Company.id == company_id))
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
         
-        # Get vouchers with debug logging
-        vouchers = db.query(models.Voucher).filter(
+        # Get one page of vouchers
+        stmt = filters.apply(voucher_rows_select(models.VOUCHER_KEY)).where(
             models.Voucher.company_id == company_id
-        ).order_by(models.Voucher.created_at.desc()).all()
-        
-        print(f"Found {len(vouchers)} vouchers")
-        return vouchers
+        )
+        page = await paginate_vouchers(db, stmt, limit, cursor, rows=True)
+        return FastJSONResponse({"items": voucher_row_dicts(page["items"]), "next_cursor": page["next_cursor"]})
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching vouchers: {str(e)}")
+        logger.exception("Error fetching company vouchers")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
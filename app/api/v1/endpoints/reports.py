@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.query_counter import query_budget
+from app.core.security import get_current_admin
+from app.models import models
+from typing import Literal, Optional, Tuple
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+
+router = APIRouter()
+
+DEFAULT_REPORT_DAYS = 7
+MAX_REPORT_DAYS = 366
+
+def report_window(start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Resolve the requested range, defaulting to the last week; naive times are UTC"""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=DEFAULT_REPORT_DAYS)
+    start, end = (
+        moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+        for moment in (start, end)
+    )
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > timedelta(days=MAX_REPORT_DAYS):
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_REPORT_DAYS} days")
+    return start, end
+
+def redemptions_total():
+    return cast(func.sum(models.RedemptionRollup.count), BigInteger).label("redemptions")
+
+@router.get("/redemptions", dependencies=[Depends(query_budget(2))])
+async def get_redemption_series(
+    company_id: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Literal["hour", "day"] = "hour",
+    branch_id: Optional[UUID] = None,
+    attendant_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Redemptions over time for a company.
+
+    Parameters:
+    - **company_id**: Company to report on
+    - **start** / **end**: Range of hours to include (default: the last 7 days)
+    - **bucket**: `hour` (default) or `day`, in UTC
+    - **branch_id**, **attendant_id**: Optional filters
+
+    Returns:
+    - **series**: `{bucket, redemptions}` per bucket with any activity, oldest first
+
+    Served from the hourly redemption rollup, so the cost depends on the
+    range and not on the size of the voucher table.
+    """
+    start, end = report_window(start, end)
+    rollup = models.RedemptionRollup
+    period = rollup.hour if bucket == "hour" else func.date_trunc("day", rollup.hour, "UTC")
+    stmt = (
+        select(period.label("bucket"), redemptions_total())
+        .where(rollup.company_id == company_id, rollup.hour >= start, rollup.hour < end)
+        .group_by(period)
+        .order_by(period)
+    )
+    if branch_id is not None:
+        stmt = stmt.where(rollup.branch_id == branch_id)
+    if attendant_id is not None:
+        stmt = stmt.where(rollup.attendant_id == attendant_id)
+
+    rows = (await db.execute(stmt)).all()
+    return {
+        "company_id": str(company_id),
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "series": [{"bucket": row.bucket, "redemptions": row.redemptions} for row in rows]
+    }
+
+@router.get("/top-branches", dependencies=[Depends(query_budget(2))])
+async def get_top_branches(
+    company_id: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Branches with the most redemptions of a company's vouchers in a range.
+
+    Parameters:
+    - **company_id**: Company to report on
+    - **start** / **end**: Range of hours to include (default: the last 7 days)
+    - **limit**: Number of branches to return (default: 10, max: 100)
+    """
+    start, end = report_window(start, end)
+    rollup = models.RedemptionRollup
+    total = redemptions_total()
+    rows = (await db.execute(
+        select(models.Branch.id, models.Branch.name, total)
+        .join(models.Branch, models.Branch.id == rollup.branch_id)
+        .where(rollup.company_id == company_id, rollup.hour >= start, rollup.hour < end)
+        .group_by(models.Branch.id)
+        .having(func.sum(rollup.count) > 0)
+        .order_by(total.desc(), models.Branch.name)
+        .limit(limit)
+    )).all()
+    return {
+        "company_id": str(company_id),
+        "start": start,
+        "end": end,
+        "branches": [
+            {"branch_id": str(row.id), "branch_name": row.name, "redemptions": row.redemptions}
+            for row in rows
+        ]
+    }
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends
+from app.core.bloom import voucher_filter
+from app.core.cache import verify_cache
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import pool_metrics, request_metrics
+from app.core.security import admin_cache, get_current_admin
+from app.models import models
+from app.utils.voucher_lookup import company_cache
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def get_db_pool_stats(
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Report live database connection pool usage.
+
+    Returns:
+    - **pool_size** / **max_overflow**: Configured pool limits
+    - **checked_out**: Connections currently in use
+    - **overflow**: Overflow connections currently open
+    - **checkout_wait_seconds**: Histogram of time spent waiting for a connection
+    - **connection_hold_seconds**: Histogram of how long connections were held
+
+    Requires admin authentication.
+    """
+    stats = pool_metrics.snapshot(engine.pool)
+    stats["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return stats
+
+@router.get("/requests")
+async def get_request_stats(
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Report per-route request latency and SQL cost since startup.
+
+    Returns:
+    - **in_flight**: Requests currently being served
+    - **routes**: Per `METHOD /route` response counts, histograms of latency,
+      statements run, database time and slowest statement per request, and
+      the text of the slowest statement seen
+
+    The same figures are exported at `/metrics`. Requires admin authentication.
+    """
+    return request_metrics.snapshot()
+
+@router.get("/caches")
+async def get_cache_stats(
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Report size and hit/miss counters for the in-process caches.
+
+    Returns:
+    - **admin**: Resolved admin principals used by authentication
+    - **verify**: Voucher verify results, including negative entries
+    - **company**: Company ids by acronym, used to route code lookups
+
+    Requires admin authentication.
+    """
+    return {
+        "admin": admin_cache.stats(),
+        "verify": verify_cache.stats(),
+        "company": company_cache.stats()
+    }
+
+@router.get("/bloom")
+async def get_bloom_filter_stats(
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Report memory use and accuracy of the per-company voucher code filters.
+
+    Returns:
+    - **bytes** / **codes**: Total filter memory and codes tracked
+    - **definite_misses**: Lookups of codes not in the filter, kept out of the verify cache
+    - **filters**: Per-company count, capacity, bytes and estimated false positive rate
+
+    Requires admin authentication.
+    """
+    return voucher_filter.stats()
+
+@router.post("/bloom/rebuild")
+async def rebuild_bloom_filters(
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Rebuild every voucher code filter from the database, e.g. after bulk
+    imports or a false positive rate setting change. Only affects this worker.
+    """
+    await voucher_filter.rebuild()
+    stats = voucher_filter.stats()
+    stats.pop("filters")
+    return stats
@@ -1,68 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy import BigInteger, DateTime, Row, String, column, exists, func, literal, select, union_all, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.bloom import voucher_filter
+from app.core.cache import verify_cache
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse
+from app.core.jobs import jobs
+from app.core.logging import sampled
+from app.core.query_counter import query_budget
 from app.core.security import get_current_admin
 from app.models import models
 from app.schemas import schemas
-from typing import List, Dict
+from app.utils.voucher_bulk import INVALIDATE, REVERT, BulkTransition, run_bulk_transition
+from app.utils.redemption_rollups import apply_rollup_deltas, redemption
+from app.utils.voucher_counters import apply_counter_deltas, transition
+from app.utils.voucher_export import export_response, export_select
+from app.utils.voucher_generator import generate_voucher_codes, split_voucher_code
+from app.utils.voucher_lookup import (
+    resolve_voucher_code, resolve_voucher_codes, voucher_key_matches, voucher_keys_in
+)
+from app.utils.voucher_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, VoucherFilters, paginate_vouchers
+from app.utils.voucher_rows import VOUCHER_ROW_COLUMNS, voucher_row_dicts, voucher_rows_select
+from app.utils.voucher_stats import status_count_columns, usage_percentage
+from typing import List, Dict, Iterable, Literal, Optional
 from uuid import UUID
-import random
-import string
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
+import uuid
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-def generate_voucher_code(company_acronym: str, length: int = 6) -> str:
-    """Generate a unique voucher code"""
-    chars = string.ascii_uppercase + string.digits
-    random_str = ''.join(random.choice(chars) for _ in range(length))
-    return f"{company_acronym}-{random_str}"
+# Rows per INSERT statement; keeps bind parameters well under driver limits.
+VOUCHER_INSERT_CHUNK_SIZE = 1000
+# Collisions are rare, so a handful of regeneration rounds is plenty.
+MAX_CODE_GENERATION_ROUNDS = 10
+
+# Upper bounds on vouchers issued by one POST /create and on records
+# accepted by POST /use/batch
+MAX_VOUCHERS_PER_REQUEST = 5000
+MAX_BATCH_REDEMPTIONS = 5000
+
+_NOT_CACHED = object()
+
+def parse_scanned_at(value: str) -> datetime:
+    """ISO 8601 timestamp from a till; fromisoformat only takes a "Z" suffix from Python 3.11"""
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+async def insert_voucher_codes(
+    db: AsyncSession,
+    codes: Iterable[str],
+    company_id: UUID,
+    created_by: UUID,
+    batch_id: Optional[UUID] = None
+) -> List[Row]:
+    """
+    Insert vouchers for the given codes with multi-row INSERT ... ON CONFLICT DO NOTHING.
+
+    Each row stores the code's integer suffix for the (company_id, suffix_int)
+    unique index. Returns the rows that were actually created (via RETURNING)
+    as VOUCHER_ROW_COLUMNS plus suffix_int; codes that collided with an
+    existing voucher are silently skipped. Codes still held by an archived
+    voucher are skipped too, so a redeemed code is never issued again.
+    """
+    codes = list(codes)
+    inserted = []
+    for start in range(0, len(codes), VOUCHER_INSERT_CHUNK_SIZE):
+        new_vouchers = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("code", String),
+            column("suffix_int", BigInteger),
+            name="new_vouchers"
+        ).data([
+            (uuid.uuid4(), code, split_voucher_code(code)[1])
+            for code in codes[start:start + VOUCHER_INSERT_CHUNK_SIZE]
+        ])
+        stmt = (
+            insert(models.Voucher)
+            .from_select(
+                ["id", "code", "suffix_int", "company_id", "created_by", "batch_id"],
+                select(
+                    new_vouchers.c.id,
+                    new_vouchers.c.code,
+                    new_vouchers.c.suffix_int,
+                    literal(company_id, PG_UUID(as_uuid=True)),
+                    literal(created_by, PG_UUID(as_uuid=True)),
+                    literal(batch_id, PG_UUID(as_uuid=True))
+                ).where(~exists().where(
+                    models.VoucherArchive.company_id == company_id,
+                    models.VoucherArchive.suffix_int == new_vouchers.c.suffix_int
+                ))
+            )
+            .on_conflict_do_nothing(index_elements=[models.Voucher.company_id, models.Voucher.suffix_int])
+            .returning(*VOUCHER_ROW_COLUMNS, models.Voucher.suffix_int)
+        )
+        inserted.extend((await db.execute(stmt)).all())
+    return inserted
 
 
 @router.get("/stats")
 async def get_voucher_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """Get overall voucher statistics"""
     try:
-        print("Fetching voucher stats") # Debug log
-        
-        # Get total vouchers
-        total_vouchers = db.query(models.Voucher).count()
-        print(f"Total vouchers: {total_vouchers}")
-
-        # Get active vouchers
-        active_vouchers = db.query(models.Voucher).filter(
-            models.Voucher.status == "active"
-        ).count()
-        print(f"Active vouchers: {active_vouchers}")
-
-        # Get used vouchers
-        used_vouchers = db.query(models.Voucher).filter(
-            models.Voucher.status == "used"
-        ).count()
-        print(f"Used vouchers: {used_vouchers}")
+        # Summed from the maintained counters; a few rows per company
+        counts = (await db.execute(select(*status_count_columns()))).one()
 
         stats = {
-            "total": total_vouchers,
-            "active": active_vouchers,
-            "used": used_vouchers
+            "total": counts.total,
+            "active": counts.active,
+            "used": counts.used
         }
-        print(f"Returning stats: {stats}")
+        logger.debug("Voucher stats", extra=stats)
         return stats
     
     except Exception as e:
-        print(f"Error getting voucher stats: {str(e)}")
+        logger.exception("Error getting voucher stats")
         raise HTTPException(
             status_code=500, 
             detail=f"Error fetching voucher statistics: {str(e)}"
         )
 
-@router.post("/create", response_model=List[schemas.Voucher])  # Change response model to List
+@router.post("/create", response_model=List[schemas.Voucher], response_class=FastJSONResponse)
 async def create_voucher(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
     """
@@ -70,69 +140,156 @@ async def create_voucher(
 
     Parameters:
     - **company_id**: UUID of the company
-    - **count**: Number of vouchers to create (default: 1, max: 100)
+    - **count**: Number of vouchers to create (default: 1, max: 5000)
     
     Returns:
     - List of created voucher objects
+
+    All vouchers from one request belong to a new voucher batch; its id is
+    on every returned voucher and in the `X-Voucher-Batch-Id` header.
+
+    The vouchers are encoded with orjson straight from the INSERT's
+    RETURNING rows, without building ORM objects.
     """
     body = await request.json()
     company_id = body.get("company_id")
     count = body.get("count", 1)
     
-    if count < 1 or count > 5000:  # Limit to 100 vouchers per request
-        raise HTTPException(status_code=400, detail="Count must be between 1 and 5000")
+    if count < 1 or count > MAX_VOUCHERS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Count must be between 1 and {MAX_VOUCHERS_PER_REQUEST}")
     
     # Verify company exists
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
+    company = await db.scalar(select(models.Company).where(models.Company.id == company_id))
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
+    # Generate all candidate codes up front and let the unique index on
+    # (company_id, suffix_int) reject collisions; only those are regenerated.
     created_vouchers = []
-    for _ in range(count):
-        code = generate_voucher_code(company.acronym)
-        while db.query(models.Voucher).filter(models.Voucher.code == code).first():
-            code = generate_voucher_code(company.acronym)
-            
-        db_voucher = models.Voucher(
-            code=code,
-            company_id=company_id,
-            created_by=current_admin.id
-        )
-        db.add(db_voucher)
-        created_vouchers.append(db_voucher)
-    
+    tried_codes = set()
+    pending = generate_voucher_codes(company.acronym, count, scheme=company.code_scheme)
     try:
-        db.commit()
+        batch = models.VoucherBatch(company_id=company.id, size=count, created_by=current_admin.id)
+        db.add(batch)
+        await db.flush()
+
+        for _ in range(MAX_CODE_GENERATION_ROUNDS):
+            tried_codes.update(pending)
+            created_vouchers.extend(
+                await insert_voucher_codes(db, pending, company.id, current_admin.id, batch.id)
+            )
+            missing = count - len(created_vouchers)
+            if missing == 0:
+                break
+            pending = generate_voucher_codes(
+                company.acronym, missing, exclude=tried_codes, scheme=company.code_scheme
+            )
+        else:
+            raise HTTPException(status_code=500, detail="Could not generate unique voucher codes")
+
+        await apply_counter_deltas(db, transition(company.id, None, "active", len(created_vouchers)))
+        await db.commit()
+        # Drop any negative verify entries for the new codes
         for voucher in created_vouchers:
-            db.refresh(voucher)
-        return created_vouchers
+            verify_cache.pop(voucher.code)
+        voucher_filter.add(company.id, (voucher.suffix_int for voucher in created_vouchers))
+        return FastJSONResponse(
+            voucher_row_dicts(created_vouchers),
+            headers={"X-Voucher-Batch-Id": str(batch.id)}
+        )
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[schemas.Voucher])
+@router.get(
+    "/",
+    response_model=schemas.VoucherPage,
+    response_class=FastJSONResponse,
+    dependencies=[Depends(query_budget(2))]
+)
 async def get_vouchers(
-    db: Session = Depends(get_db),
+    company_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: VoucherFilters = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    vouchers = db.query(models.Voucher).all()
-    return vouchers
+    """
+    List vouchers one page at a time, newest first.
+
+    Parameters:
+    - **company_id**, **status**, **used_by**: Optional filters
+    - **created_from** / **created_to**, **used_from** / **used_to**: Optional date ranges
+    - **limit**: Page size (max 1000)
+    - **cursor**: `next_cursor` from the previous page
+
+    Returns:
+    - **items**: Vouchers on this page
+    - **next_cursor**: Cursor for the next page, or null on the last page
+
+    Rows are read column-only and encoded with orjson.
+    """
+    stmt = filters.apply(voucher_rows_select(models.VOUCHER_KEY))
+    if company_id is not None:
+        stmt = stmt.where(models.Voucher.company_id == company_id)
+    page = await paginate_vouchers(db, stmt, limit, cursor, rows=True)
+    return FastJSONResponse({"items": voucher_row_dicts(page["items"]), "next_cursor": page["next_cursor"]})
 
-@router.get("/{voucher_id}", response_model=schemas.Voucher)
+@router.get("/export")
+async def export_vouchers(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    company_id: Optional[UUID] = None,
+    filters: VoucherFilters = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Stream vouchers as NDJSON or CSV for reconciliation.
+
+    Parameters:
+    - **format**: `ndjson` (default) or `csv`
+    - **company_id**, **status**, **used_by**: Optional filters
+    - **created_from** / **created_to**, **used_from** / **used_to**: Optional date ranges
+
+    Archived vouchers are included. Rows are read from a server-side cursor
+    in fixed-size chunks and written as they arrive, so memory stays flat
+    regardless of the export size.
+    """
+    # Return the connection the admin lookup may have used; the stream opens
+    # its own and can outlive the request by minutes
+    await db.commit()
+    def matching(table):
+        criteria = filters.criteria(table)
+        if company_id is not None:
+            criteria.append(table.company_id == company_id)
+        return criteria
+
+    return export_response(export_select(matching), export_format, "vouchers")
+
+@router.get("/{voucher_id}", response_model=schemas.Voucher, dependencies=[Depends(query_budget(3))])
 async def get_voucher(
     voucher_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    voucher = db.query(models.Voucher).filter(models.Voucher.id == voucher_id).first()
+    voucher = await db.scalar(select(models.Voucher).where(models.Voucher.id == voucher_id))
+    if not voucher:
+        # Finished vouchers past the retention window live in the archive
+        voucher = await db.scalar(
+            select(models.VoucherArchive).where(models.VoucherArchive.id == voucher_id)
+        )
     if not voucher:
         raise HTTPException(status_code=404, detail="Voucher not found")
     return voucher
 
-@router.post("/verify/{code}")
+@router.post("/verify/{code}", dependencies=[Depends(query_budget(4))])
 async def verify_voucher(
     code: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Verify a voucher's status without using it.
@@ -149,22 +306,232 @@ async def verify_voucher(
     This endpoint can be used to check if a voucher is valid
     before attempting to use it.
     """
-    voucher = db.query(models.Voucher).filter(models.Voucher.code == code.upper()).first()
-    if not voucher:
+    code = code.upper()
+    key = await resolve_voucher_code(db, code)
+    if key is None:
         raise HTTPException(status_code=404, detail="Voucher not found")
-    
+
+    # A filter miss is only a hint: codes issued by other workers reach this
+    # worker's filter on its next refresh. Misses still ask Postgres but skip
+    # the cache, so a burst of guessed codes can't evict real entries or
+    # fill it with negative ones.
+    known = await voucher_filter.might_contain(*key)
+    result = verify_cache.get(code, _NOT_CACHED) if known else _NOT_CACHED
+    cached = result is not _NOT_CACHED
+    if not cached:
+        generation = verify_cache.generation
+        # Live table first, then the archive, in one round trip
+        voucher = (await db.execute(
+            union_all(*(
+                select(
+                    table.status,
+                    table.created_at,
+                    table.used_at,
+                    models.Company.name.label("company_name"),
+                    literal(source).label("source")
+                )
+                .join(models.Company, models.Company.id == table.company_id)
+                .where(*voucher_key_matches(key, table))
+                for source, table in enumerate((models.Voucher, models.VoucherArchive))
+            )).order_by("source").limit(1)
+        )).first()
+        if voucher:
+            result = {
+                "status": voucher.status,
+                "company": voucher.company_name,
+                "created_at": voucher.created_at,
+                "used_at": voucher.used_at
+            }
+            verify_cache.set_if_current(generation, code, result)
+            if not known:
+                voucher_filter.add(key.company_id, [key.suffix_int])
+        else:
+            result = None
+            if known:
+                # Short-lived negative entry so repeated scans of a bad code stay cheap
+                verify_cache.set_if_current(
+                    generation, code, None, ttl=settings.VERIFY_CACHE_NEGATIVE_TTL_SECONDS
+                )
+
+    if sampled(logger):
+        logger.debug("Voucher verified", extra={
+            "code": code, "status": result and result["status"], "cached": cached, "filter_miss": not known
+        })
+    if result is None:
+        raise HTTPException(status_code=404, detail="Voucher not found")
+    return result
+
+@router.post("/use/batch", dependencies=[Depends(query_budget(7))])
+async def use_vouchers_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply a batch of queued redemptions, e.g. from a till coming back online.
+
+    Parameters:
+    - **redemptions**: List of `{code, attendant_id, scanned_at}` records
+      (max 5000; `scanned_at` is ISO 8601 and defaults to now; times in the
+      future are recorded as now, and times before the voucher was created
+      as its creation time)
+
+    Returns:
+    - **results**: One `{code, outcome}` per record, in request order, where
+      outcome is `used`, `already-used`, `invalid`, `not-found` or
+      `attendant-not-found`
+    - **summary**: Count of records per outcome
+
+    All redemptions are applied in one transaction with set-based
+    conditional updates. When a code appears more than once, the earliest
+    scan wins and the rest report `already-used`.
+    """
+    body = await request.json()
+    redemptions = body.get("redemptions")
+    if not isinstance(redemptions, list) or not redemptions:
+        raise HTTPException(status_code=400, detail="redemptions must be a non-empty list")
+    if len(redemptions) > MAX_BATCH_REDEMPTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_REDEMPTIONS} redemptions per request"
+        )
+
+    now = datetime.now(timezone.utc)
+    scans = []
+    for index, record in enumerate(redemptions):
+        try:
+            scanned_at = parse_scanned_at(record["scanned_at"]) if record.get("scanned_at") else now
+            # Tills without a zone are assumed to report UTC
+            scanned_at = scanned_at if scanned_at.tzinfo else scanned_at.replace(tzinfo=timezone.utc)
+            scans.append({
+                "index": index,
+                "code": str(record["code"]).upper(),
+                "attendant_id": UUID(str(record["attendant_id"])),
+                # A queued scan happened before it reached us; a till clock
+                # running ahead is recorded as now
+                "scanned_at": min(scanned_at, now),
+            })
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid redemption record at index {index}")
+
+    outcomes: Dict[int, str] = {}
+
+    # Attendant id -> branch id, recorded on the vouchers each one redeems
+    known_attendants = dict((await db.execute(
+        select(models.Attendant.id, models.Attendant.branch_id).where(
+            models.Attendant.id.in_({scan["attendant_id"] for scan in scans})
+        )
+    )).all())
+    candidates: Dict[str, dict] = {}
+    duplicates = []
+    for scan in sorted(scans, key=lambda scan: scan["scanned_at"]):
+        if scan["attendant_id"] not in known_attendants:
+            outcomes[scan["index"]] = "attendant-not-found"
+        elif scan["code"] in candidates:
+            duplicates.append(scan)
+        else:
+            candidates[scan["code"]] = scan
+
+    # Codes that can't be resolved to an index key are simply not found. The
+    # code filter is not consulted: it can lag codes issued by other workers.
+    keys = await resolve_voucher_codes(db, candidates)
+
+    redeemed = []
+    if keys:
+        # One conditional UPDATE joined against the batch as a VALUES list
+        batch = values(
+            column("company_id", PG_UUID(as_uuid=True)),
+            column("suffix_int", BigInteger),
+            column("attendant_id", PG_UUID(as_uuid=True)),
+            column("branch_id", PG_UUID(as_uuid=True)),
+            column("scanned_at", DateTime(timezone=True)),
+            name="scans"
+        ).data([
+            (*keys[code], scan["attendant_id"], known_attendants[scan["attendant_id"]], scan["scanned_at"])
+            for code, scan in candidates.items()
+            if code in keys
+        ])
+        redeemed = (await db.execute(
+            update(models.Voucher.__table__)
+            .where(
+                models.Voucher.company_id == batch.c.company_id,
+                models.Voucher.suffix_int == batch.c.suffix_int,
+                models.Voucher.status == "active"
+            )
+            # A till clock running behind can't date the use before the voucher existed
+            .values(
+                status="used",
+                used_by=batch.c.attendant_id,
+                used_at=func.greatest(batch.c.scanned_at, models.Voucher.created_at),
+                used_branch_id=batch.c.branch_id
+            )
+            .returning(
+                models.Voucher.code,
+                models.Voucher.company_id,
+                models.Voucher.used_by,
+                models.Voucher.used_at,
+                models.Voucher.used_branch_id
+            )
+        )).all()
+
+    redeemed_codes = {row.code for row in redeemed}
+    remaining = set(keys) - redeemed_codes
+    current_status = {}
+    if remaining:
+        # Archived vouchers are finished and report their final status; live
+        # rows come last so they win should a key ever be in both tables
+        current_status = dict((await db.execute(
+            union_all(*(
+                select(table.code, table.status)
+                .where(voucher_keys_in((keys[code] for code in remaining), table))
+                for table in (models.VoucherArchive, models.Voucher)
+            ))
+        )).all())
+
+    candidate_outcomes = {}
+    for code in candidates:
+        if code in redeemed_codes:
+            candidate_outcomes[code] = "used"
+        elif code not in current_status:
+            candidate_outcomes[code] = "not-found"
+        elif current_status[code] == "invalid":
+            candidate_outcomes[code] = "invalid"
+        else:
+            candidate_outcomes[code] = "already-used"
+        outcomes[candidates[code]["index"]] = candidate_outcomes[code]
+    for scan in duplicates:
+        outcome = candidate_outcomes[scan["code"]]
+        outcomes[scan["index"]] = "already-used" if outcome == "used" else outcome
+
+    deltas = Counter()
+    rollup_deltas = Counter()
+    for row in redeemed:
+        deltas.update(transition(row.company_id, "active", "used"))
+        rollup_deltas.update(
+            redemption(row.company_id, row.used_branch_id, row.used_by, row.used_at)
+        )
+    await apply_counter_deltas(db, deltas)
+    await apply_rollup_deltas(db, rollup_deltas)
+    await db.commit()
+    for code in redeemed_codes:
+        verify_cache.pop(code)
+
+    results = [
+        {"code": scan["code"], "outcome": outcomes[scan["index"]]}
+        for scan in scans
+    ]
+    summary = dict(Counter(result["outcome"] for result in results))
+    if sampled(logger):
+        logger.debug("Voucher batch applied", extra={"records": len(results), **summary})
     return {
-        "status": voucher.status,
-        "company": voucher.company.name,
-        "created_at": voucher.created_at,
-        "used_at": voucher.used_at
+        "results": results,
+        "summary": summary
     }
 
-@router.post("/use/{code}")
+@router.post("/use/{code}", dependencies=[Depends(query_budget(6))])
 async def use_voucher(
     code: str,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     body = await request.json()
     attendant_id = body.get("attendant_id")
@@ -174,103 +541,277 @@ async def use_voucher(
     except (ValueError, TypeError):
         raise HTTPException(status_code=400, detail="Invalid attendant ID format")
     
-    # Verify attendant exists
-    attendant = db.query(models.Attendant).filter(models.Attendant.id == attendant_uuid).first()
-    if not attendant:
-        raise HTTPException(status_code=404, detail="Attendant not found")
-    
-    voucher = db.query(models.Voucher).filter(models.Voucher.code == code.upper()).first()
-    if not voucher:
+    # The code filter is not consulted: it can lag codes issued by other
+    # workers, and the UPDATE below is a single index probe anyway
+    key = await resolve_voucher_code(db, code.upper())
+    if key is None:
         raise HTTPException(status_code=404, detail="Voucher not found")
-    
-    if voucher.status != "active":
-        raise HTTPException(status_code=400, detail=f"Voucher is {voucher.status}")
-    
-    voucher.status = "used"
-    voucher.used_by = attendant_uuid
-    voucher.used_at = datetime.utcnow()
-    db.commit()
+
+    # Redeem in a single conditional UPDATE so two tills scanning the same
+    # code can't both succeed; attendant and branch come back via RETURNING.
+    attendant = (
+        select(
+            models.Attendant.email,
+            models.Attendant.branch_id,
+            models.Branch.name.label("branch_name")
+        )
+        .join(models.Branch, models.Branch.id == models.Attendant.branch_id)
+        .where(models.Attendant.id == attendant_uuid)
+        .cte("redeeming_attendant")
+    )
+    redeemed = (await db.execute(
+        update(models.Voucher.__table__)
+        .where(
+            *voucher_key_matches(key),
+            models.Voucher.status == "active",
+            exists(select(attendant.c.email))
+        )
+        .values(
+            status="used",
+            used_by=attendant_uuid,
+            used_at=func.now(),
+            used_branch_id=select(attendant.c.branch_id).scalar_subquery()
+        )
+        .returning(
+            models.Voucher.code,
+            models.Voucher.company_id,
+            models.Voucher.used_at,
+            models.Voucher.used_branch_id.label("branch_id"),
+            select(attendant.c.email).scalar_subquery().label("email"),
+            select(attendant.c.branch_name).scalar_subquery().label("branch_name")
+        )
+    )).first()
+
+    if not redeemed:
+        await db.rollback()
+        # Nothing was updated; work out why with one more round trip
+        attendant_exists, voucher_status, archived_status = (await db.execute(
+            select(
+                exists().where(models.Attendant.id == attendant_uuid),
+                select(models.Voucher.status)
+                .where(*voucher_key_matches(key))
+                .scalar_subquery(),
+                select(models.VoucherArchive.status)
+                .where(*voucher_key_matches(key, models.VoucherArchive))
+                .scalar_subquery()
+            )
+        )).one()
+        voucher_status = voucher_status or archived_status
+        if sampled(logger):
+            logger.debug("Voucher use rejected", extra={
+                "code": code, "attendant_id": attendant_uuid,
+                "attendant_exists": attendant_exists, "status": voucher_status
+            })
+        if not attendant_exists:
+            raise HTTPException(status_code=404, detail="Attendant not found")
+        if voucher_status is None:
+            raise HTTPException(status_code=404, detail="Voucher not found")
+        raise HTTPException(status_code=400, detail=f"Voucher is {voucher_status}")
+
+    await apply_counter_deltas(db, transition(redeemed.company_id, "active", "used"))
+    await apply_rollup_deltas(
+        db, redemption(redeemed.company_id, redeemed.branch_id, attendant_uuid, redeemed.used_at)
+    )
+    await db.commit()
+    verify_cache.pop(redeemed.code)
+    if sampled(logger):
+        logger.debug("Voucher used", extra={
+            "code": redeemed.code, "attendant_id": attendant_uuid, "branch_id": redeemed.branch_id
+        })
     
     return {
         "message": "Voucher used successfully",
-        "voucher_code": voucher.code,
-        "used_by": attendant.email,
-        "branch": attendant.branch.name
+        "voucher_code": redeemed.code,
+        "used_by": redeemed.email,
+        "branch": redeemed.branch_name
     }
 
+async def start_bulk_transition(
+    db: AsyncSession,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    operation: BulkTransition,
+    background: bool
+) -> dict:
+    body = await request.json()
+    try:
+        selection = schemas.VoucherBulkSelection.model_validate(body)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid bulk selection")
+    if selection.codes is None and selection.company_id is None:
+        raise HTTPException(status_code=400, detail="Provide codes or company_id")
+
+    job = jobs.create(operation.kind)
+    if selection.codes is not None:
+        selector = {"codes": selection.codes}
+    else:
+        selector = {
+            "company_id": selection.company_id,
+            "filters": VoucherFilters(
+                status=selection.status,
+                created_from=selection.created_from,
+                created_to=selection.created_to
+            )
+        }
+
+    # The job works in its own sessions. Return the connection the admin
+    # lookup may have used, which teardown would otherwise hold until after
+    # the job, even a background one
+    await db.commit()
+    if background:
+        background_tasks.add_task(run_bulk_transition, job, operation, **selector)
+        response.status_code = 202
+        return job.to_dict()
+
+    await run_bulk_transition(job, operation, **selector)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.to_dict()
+
+@router.post("/invalidate/bulk")
+async def invalidate_vouchers_bulk(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Invalidate many vouchers at once.
+
+    Parameters:
+    - **codes**: List of voucher codes, or
+    - **company_id** (required without codes), **status**, **created_from**,
+      **created_to**: Filter selecting the vouchers to invalidate
+    - **background** (query): Return immediately with a job id instead of
+      waiting; poll `GET /api/v1/voucher/jobs/{job_id}` for progress
+
+    Returns:
+    - Job record with **total**, **processed** and **affected** counts
+
+    Vouchers are updated in chunks of 1000, each in its own short
+    transaction. Vouchers that are already invalid are skipped.
+    """
+    return await start_bulk_transition(db, request, response, background_tasks, INVALIDATE, background)
+
 @router.post("/invalidate/{code}")
 async def invalidate_voucher(
     code: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    voucher = db.query(models.Voucher).filter(models.Voucher.code == code.upper()).first()
+    # Lock the row so the counter transition matches the status actually replaced
+    key = await resolve_voucher_code(db, code.upper())
+    voucher = None
+    if key is not None:
+        voucher = await db.scalar(
+            select(models.Voucher).where(*voucher_key_matches(key)).with_for_update()
+        )
     if not voucher:
         raise HTTPException(status_code=404, detail="Voucher not found")
     
     if voucher.status == "invalid":
         raise HTTPException(status_code=400, detail="Voucher is already invalidated")
     
+    await apply_counter_deltas(db, transition(voucher.company_id, voucher.status, "invalid"))
     voucher.status = "invalid"
-    db.commit()
+    await db.commit()
+    verify_cache.pop(voucher.code)
     
     return {"message": "Voucher invalidated successfully"}
 
-@router.post("/revert/{code}")
+@router.post("/revert/bulk")
+async def revert_vouchers_bulk(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Revert the usage of many vouchers at once.
+
+    Takes the same selection and **background** option as
+    `POST /api/v1/voucher/invalidate/bulk`. Only used vouchers are reverted;
+    the rest are skipped.
+    """
+    return await start_bulk_transition(db, request, response, background_tasks, REVERT, background)
+
+@router.post("/revert/{code}", dependencies=[Depends(query_budget(7))])
 async def revert_voucher_usage(
     code: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    voucher = db.query(models.Voucher).filter(models.Voucher.code == code.upper()).first()
+    key = await resolve_voucher_code(db, code.upper())
+    voucher = None
+    if key is not None:
+        voucher = await db.scalar(
+            select(models.Voucher).where(*voucher_key_matches(key)).with_for_update()
+        )
     if not voucher:
         raise HTTPException(status_code=404, detail="Voucher not found")
     
     if voucher.status != "used":
         raise HTTPException(status_code=400, detail="Can only revert used vouchers")
     
+    await apply_counter_deltas(db, transition(voucher.company_id, "used", "active"))
+    if voucher.used_by is not None and voucher.used_at is not None:
+        await apply_rollup_deltas(
+            db, redemption(voucher.company_id, voucher.used_branch_id, voucher.used_by, voucher.used_at, -1)
+        )
     voucher.status = "active"
     voucher.used_by = None
     voucher.used_at = None
-    db.commit()
+    voucher.used_branch_id = None
+    await db.commit()
+    verify_cache.pop(voucher.code)
     
     return {"message": "Voucher usage reverted successfully"}
 
+@router.get("/jobs/{job_id}")
+async def get_bulk_job(
+    job_id: str,
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    """
+    Get the progress of a bulk invalidate/revert job.
+
+    Returns:
+    - **status**: running, completed or failed
+    - **total** / **processed** / **affected**: Progress counters
+
+    Jobs are tracked in memory by the worker that runs them.
+    """
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
 @router.get("/company/{company_id}/stats")
 async def get_company_voucher_stats(
     company_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    # Verify company exists
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
-    if not company:
+    # Company lookup and per-status counters in a single query
+    stats = (await db.execute(
+        select(models.Company.name, *status_count_columns())
+        .outerjoin(models.VoucherCounter, models.VoucherCounter.company_id == models.Company.id)
+        .where(models.Company.id == company_id)
+        .group_by(models.Company.id)
+    )).first()
+    if not stats:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    total = db.query(models.Voucher).filter(
-        models.Voucher.company_id == company_id
-    ).count()
-    
-    active = db.query(models.Voucher).filter(
-        models.Voucher.company_id == company_id,
-        models.Voucher.status == "active"
-    ).count()
-    
-    used = db.query(models.Voucher).filter(
-        models.Voucher.company_id == company_id,
-        models.Voucher.status == "used"
-    ).count()
-    
-    invalid = db.query(models.Voucher).filter(
-        models.Voucher.company_id == company_id,
-        models.Voucher.status == "invalid"
-    ).count()
-    
     return {
-        "company_name": company.name,
-        "total_vouchers": total,
-        "active_vouchers": active,
-        "used_vouchers": used,
-        "invalid_vouchers": invalid,
-        "usage_percentage": (used/total * 100) if total > 0 else 0
-    }
+        "company_name": stats.name,
+        "total_vouchers": stats.total,
+        "active_vouchers": stats.active,
+        "used_vouchers": stats.used,
+        "invalid_vouchers": stats.invalid,
+        "usage_percentage": usage_percentage(stats.used, stats.total)
+    }
\ No newline at end of file
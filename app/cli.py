@@ -0,0 +1,110 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli reconcile-counters [--dry-run]
+    python -m app.cli table-sizes
+    python -m app.cli archive [--days N] [--chunk-size N]
+    python -m app.cli backfill-rollups
+"""
+import argparse
+import asyncio
+from sqlalchemy import text
+from app.core.database import SessionLocal, engine
+from app.core.logging import configure_logging, stop_logging
+from app.utils.redemption_rollups import rebuild_rollups
+from app.utils.voucher_archive import ARCHIVE_CHUNK_SIZE, archive_vouchers
+from app.utils.voucher_counters import reconcile_counters
+
+async def run_reconcile_counters(args) -> None:
+    async with SessionLocal() as db:
+        drift = await reconcile_counters(db, fix=not args.dry_run)
+    for entry in drift:
+        print(
+            f"company={entry['company_id']} status={entry['status']} "
+            f"stored={entry['stored']} actual={entry['actual']}"
+        )
+    action = "found" if args.dry_run else "fixed"
+    print(f"{len(drift)} drifted counter(s) {action}")
+
+TABLE_SIZES_SQL = text("""
+    SELECT c.relname AS name, i.indrelid::regclass::text AS table_name,
+           c.relkind::text AS kind, greatest(c.reltuples, 0)::bigint AS rows,
+           pg_relation_size(c.oid) AS relation_bytes,
+           pg_indexes_size(c.oid) AS index_bytes,
+           pg_total_relation_size(c.oid) AS total_bytes
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_index i ON i.indexrelid = c.oid
+    WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'i')
+    ORDER BY coalesce(i.indrelid::regclass::text, c.relname), c.relkind DESC, c.relname
+""")
+
+async def run_table_sizes(args) -> None:
+    async with SessionLocal() as db:
+        rows = (await db.execute(TABLE_SIZES_SQL)).all()
+    for row in rows:
+        if row.kind == "r":
+            print(
+                f"{row.name:<40} rows~{row.rows:<10} heap={row.relation_bytes:<12} "
+                f"indexes={row.index_bytes:<12} total={row.total_bytes}"
+            )
+        else:
+            print(f"  {row.name:<38} {row.relation_bytes}")
+
+async def run_archive(args) -> None:
+    moved = await archive_vouchers(args.days, args.chunk_size)
+    print(f"{moved} voucher(s) archived")
+
+async def run_backfill_rollups(args) -> None:
+    async with SessionLocal() as db:
+        written = await rebuild_rollups(db)
+    print(f"{written} redemption rollup row(s) written")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = commands.add_parser(
+        "reconcile-counters",
+        help="Rebuild voucher_counters from the voucher table and report drift"
+    )
+    reconcile.add_argument("--dry-run", action="store_true", help="Report drift without fixing it")
+    reconcile.set_defaults(handler=run_reconcile_counters)
+
+    sizes = commands.add_parser(
+        "table-sizes",
+        help="Report heap and index sizes in bytes for every table"
+    )
+    sizes.set_defaults(handler=run_table_sizes)
+
+    archive = commands.add_parser(
+        "archive",
+        help="Move used and invalid vouchers past the retention window to voucher_archive"
+    )
+    archive.add_argument("--days", type=int, help="Retention window (default: VOUCHER_ARCHIVE_RETENTION_DAYS)")
+    archive.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK_SIZE, help="Vouchers moved per transaction")
+    archive.set_defaults(handler=run_archive)
+
+    backfill = commands.add_parser(
+        "backfill-rollups",
+        help="Rebuild redemption_rollup from live and archived vouchers"
+    )
+    backfill.set_defaults(handler=run_backfill_rollups)
+
+    args = parser.parse_args()
+    configure_logging()
+
+    async def run():
+        try:
+            await args.handler(args)
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        stop_logging()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import func, select, union_all
+from .config import settings
+from .database import SessionLocal
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while building filters
+BLOOM_BUILD_CHUNK_SIZE = 10000
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over integer items.
+
+    Sized for `capacity` items at `error_rate` false positives; adding more
+    than that keeps answers correct but raises the false positive rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: int) -> Iterable[int]:
+        # Double hashing over two halves of one 128-bit digest
+        digest = hashlib.blake2b(item.to_bytes(8, "little"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: int) -> None:
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        # Re-adding a present item changes no bits; keep count near distinct items
+        if added:
+            self.count += 1
+
+    def __contains__(self, item: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def estimated_false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def stats(self) -> Dict:
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "bytes": self.nbytes,
+            "hashes": self.num_hashes,
+            "estimated_false_positive_rate": self.estimated_false_positive_rate(),
+        }
+
+class VoucherCodeFilter:
+    """
+    Per-company Bloom filters over voucher code suffixes, telling codes this
+    worker knows were issued apart from probable guesses.
+
+    Codes created by this process are added directly. Codes created by other
+    workers are picked up by an incremental refresh, started in the
+    background by a lookup that misses, at most once per
+    BLOOM_REFRESH_INTERVAL_SECONDS and never more than one at a time, or
+    added when a lookup that missed finds them in the database. A miss can
+    therefore be stale and is never grounds for rejecting a code; callers
+    only use it to keep guesses out of caches.
+    """
+
+    def __init__(self):
+        self.filters: Dict[UUID, BloomFilter] = {}
+        self.built = False
+        self.definite_misses = 0
+        self.refreshes = 0
+        self.rebuilds = 0
+        self._refreshed_through: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def _new_filter(self, count: int) -> BloomFilter:
+        capacity = max(math.ceil(count * settings.BLOOM_GROWTH_FACTOR), settings.BLOOM_MIN_CAPACITY)
+        return BloomFilter(capacity, settings.BLOOM_FALSE_POSITIVE_RATE)
+
+    def add(self, company_id: UUID, suffix_ints: Iterable[int]) -> None:
+        bloom = self.filters.get(company_id)
+        if bloom is None:
+            # Nothing to add to until the next build covers this company
+            return
+        for suffix_int in suffix_ints:
+            bloom.add(suffix_int)
+
+    async def rebuild(self, company_id: Optional[UUID] = None) -> None:
+        """Rebuild every filter, or just one company's, from the voucher table"""
+        async with self._lock:
+            async with SessionLocal() as db:
+                started_at = await db.scalar(select(func.now()))
+                # Archived codes stay valid for verify, so they stay in the filter
+                live = select(models.Voucher.company_id, models.Voucher.suffix_int)
+                archived = select(models.VoucherArchive.company_id, models.VoucherArchive.suffix_int)
+                if company_id is not None:
+                    live = live.where(models.Voucher.company_id == company_id)
+                    archived = archived.where(models.VoucherArchive.company_id == company_id)
+                suffixes = union_all(live, archived)
+                codes = suffixes.subquery()
+                counts = select(models.Company.id, func.count(codes.c.suffix_int)).outerjoin(
+                    codes, codes.c.company_id == models.Company.id
+                ).group_by(models.Company.id)
+                if company_id is not None:
+                    counts = counts.where(models.Company.id == company_id)
+
+                filters = {
+                    row_company_id: self._new_filter(count)
+                    for row_company_id, count in (await db.execute(counts)).all()
+                }
+                result = await db.stream(suffixes.execution_options(yield_per=BLOOM_BUILD_CHUNK_SIZE))
+                async for rows in result.partitions():
+                    for row_company_id, suffix_int in rows:
+                        filters[row_company_id].add(suffix_int)
+
+            if company_id is None:
+                self.filters = filters
+                self._refreshed_through = started_at
+                self.built = True
+            else:
+                self.filters.update(filters)
+            self._last_refresh = time.monotonic()
+            self.rebuilds += 1
+
+    async def refresh(self) -> None:
+        """Add codes created since the last refresh, including by other workers"""
+        async with self._lock:
+            async with SessionLocal() as db:
+                started_at = await db.scalar(select(func.now()))
+                # created_at is the inserting transaction's start time, so look
+                # back far enough to catch creates that committed since then
+                since = self._refreshed_through - timedelta(seconds=settings.BLOOM_REFRESH_OVERLAP_SECONDS)
+                rows = (await db.execute(
+                    select(models.Voucher.company_id, models.Voucher.suffix_int)
+                    .where(models.Voucher.created_at >= since)
+                )).all()
+                company_ids = (await db.scalars(select(models.Company.id))).all()
+            # Companies created since the last refresh have all their codes in `rows`
+            for company_id in company_ids:
+                if company_id not in self.filters:
+                    self.filters[company_id] = self._new_filter(0)
+            for company_id, suffix_int in rows:
+                if company_id in self.filters:
+                    self.filters[company_id].add(suffix_int)
+            self._refreshed_through = started_at
+            self._last_refresh = time.monotonic()
+            self.refreshes += 1
+        # Filters filled past capacity are rebuilt at their new size
+        for company_id, bloom in list(self.filters.items()):
+            if bloom.count > bloom.capacity:
+                await self.rebuild(company_id)
+
+    def _schedule_refresh(self) -> None:
+        """Start a background refresh unless one is running or ran within the interval"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        if time.monotonic() - self._last_refresh < settings.BLOOM_REFRESH_INTERVAL_SECONDS:
+            return
+        # Claimed before any await, so a burst of misses starts one refresh
+        self._last_refresh = time.monotonic()
+        # An empty context keeps the refresh's statements out of the
+        # triggering request's query counters
+        self._refresh_task = contextvars.Context().run(asyncio.create_task, self._refresh_in_background())
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            # The next due miss tries again
+            logger.exception("Voucher code filter refresh failed")
+
+    def cancel_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+
+    async def might_contain(self, company_id: UUID, suffix_int: int) -> bool:
+        """False when the code wasn't issued as of this worker's last refresh; a hint, not a verdict"""
+        if not self.built:
+            return True
+        bloom = self.filters.get(company_id)
+        if bloom is not None and suffix_int in bloom:
+            return True
+        # Refreshing also creates filters for companies added since the last build
+        self._schedule_refresh()
+        if bloom is None:
+            return True
+        self.definite_misses += 1
+        return False
+
+    def stats(self) -> Dict:
+        return {
+            "built": self.built,
+            "companies": len(self.filters),
+            "codes": sum(bloom.count for bloom in self.filters.values()),
+            "bytes": sum(bloom.nbytes for bloom in self.filters.values()),
+            "false_positive_rate": settings.BLOOM_FALSE_POSITIVE_RATE,
+            "definite_misses": self.definite_misses,
+            "refreshes": self.refreshes,
+            "rebuilds": self.rebuilds,
+            "filters": {str(company_id): bloom.stats() for company_id, bloom in self.filters.items()},
+        }
+
+voucher_filter = VoucherCodeFilter()
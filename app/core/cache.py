@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from .config import settings
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire after a time-to-live.
+
+    Meant for use from the event loop thread only; it does no locking.
+    Entries are only as fresh as the TTL across worker processes, since
+    invalidation is local to the process that made the change.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Bumped on every explicit invalidation; see `generation`
+        self.invalidations = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self.invalidations += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self.invalidations += 1
+        self._data.clear()
+
+    @property
+    def generation(self) -> int:
+        """
+        Read before loading a value and pass to set_if_current() afterwards,
+        so a load that raced with an invalidation doesn't re-cache stale data.
+        """
+        return self.invalidations
+
+    def set_if_current(self, generation: int, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if generation == self.invalidations:
+            self.set(key, value, ttl)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+# POST /voucher/verify results keyed by upper-cased code; None marks a code
+# known not to exist. Anything that changes a voucher's status evicts its
+# entry after committing.
+verify_cache = TTLCache(maxsize=settings.VERIFY_CACHE_SIZE, ttl=settings.VERIFY_CACHE_TTL_SECONDS)
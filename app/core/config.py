@@ -1,4 +1,6 @@
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Voucher Management System"
@@ -10,6 +12,82 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Server key for check characters on "hmac" scheme voucher codes. Rotating
+    # it invalidates every hmac code already issued.
+    VOUCHER_CODE_SECRET: Optional[str] = None
+
+    # Key vouchers by a bigint identity `pk`, keeping the UUID `id` as the
+    # external identifier, instead of by the UUID. The keyset pagination
+    # indexes shrink, but the heap and the added unique index on `id` grow by
+    # more, so it is off by default. Fixed when migrations first run past
+    # revision 5cfb840b27cc; the app must run with the same value.
+    VOUCHER_BIGINT_KEY: bool = False
+
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables the per-statement timeout
+
+    # Password hashing: bcrypt cost factor and how many hashes may run at once.
+    # Hashes with a different cost are transparently rehashed on next login.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Resolved admin principals, keyed by token subject
+    ADMIN_CACHE_SIZE: int = 1024
+    ADMIN_CACHE_TTL_SECONDS: int = 60
+
+    # POST /voucher/verify results, keyed by normalized code. Other workers'
+    # entries can lag a redemption by up to the TTL; /use itself is atomic.
+    VERIFY_CACHE_SIZE: int = 10000
+    VERIFY_CACHE_TTL_SECONDS: int = 30
+    VERIFY_CACHE_NEGATIVE_TTL_SECONDS: int = 5
+
+    # Company ids keyed by acronym, used to route voucher code lookups
+    COMPANY_CACHE_SIZE: int = 1024
+    COMPANY_CACHE_TTL_SECONDS: int = 300
+
+    # Per-company Bloom filters of issued codes. A miss keeps a probable guess
+    # out of the verify cache; the database still answers it, since codes
+    # created on another worker are missing until the next background
+    # refresh. The overlap must exceed the longest voucher-create transaction.
+    BLOOM_FILTER_ENABLED: bool = True
+    BLOOM_FALSE_POSITIVE_RATE: float = 0.001
+    BLOOM_MIN_CAPACITY: int = 1024
+    BLOOM_GROWTH_FACTOR: float = 2.0
+    BLOOM_REFRESH_INTERVAL_SECONDS: float = 5
+    BLOOM_REFRESH_OVERLAP_SECONDS: float = 60
+
+    # Used/invalid vouchers older than the retention window move to
+    # voucher_archive. The in-app scheduler is off at 0; see `python -m app.cli archive`.
+    VOUCHER_ARCHIVE_RETENTION_DAYS: int = 90
+    VOUCHER_ARCHIVE_INTERVAL_SECONDS: int = 0
+
+    # Logging: root level, per-logger overrides as JSON (e.g.
+    # {"app.api.v1.endpoints.voucher": "DEBUG"}), "json" or "text" output,
+    # and the share of hot-path debug events (auth, verify, use) kept
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {}
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATE: float = 1.0
+
+    # Per-request latency and SQL cost, served in Prometheus text format at
+    # /metrics (unauthenticated, so keep it off the public network)
+    METRICS_ENABLED: bool = True
+
+    # Raise when a request runs more SQL statements than its route's
+    # query_budget allows. Meant for local and CI runs, not production.
+    QUERY_BUDGETS_ENFORCED: bool = False
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """DATABASE_URL rewritten to use the asyncpg driver"""
+        url = make_url(self.DATABASE_URL).set(drivername="postgresql+asyncpg")
+        return url.render_as_string(hide_password=False)
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,51 @@
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Finished jobs are kept for inspection until this many newer jobs exist
+MAX_TRACKED_JOBS = 200
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+@dataclass
+class Job:
+    """Progress of a long-running bulk operation"""
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "running"
+    total: Optional[int] = None
+    processed: int = 0
+    affected: int = 0
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=_now)
+    finished_at: Optional[datetime] = None
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.status = "failed" if error else "completed"
+        self.error = error
+        self.finished_at = _now()
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class JobRegistry:
+    """In-process registry of recent jobs; progress is only visible to this worker"""
+
+    def __init__(self, max_jobs: int = MAX_TRACKED_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def create(self, kind: str) -> Job:
+        job = Job(kind=kind)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+jobs = JobRegistry()
@@ -0,0 +1,111 @@
+"""
+Logging setup: records are queued by the calling code and formatted and
+written by a background thread, so log I/O stays off the event loop.
+
+Modules log through `logging.getLogger(__name__)`. Hot paths guard their
+debug events with `sampled(logger)`, which costs one level check and
+does no formatting work while debug is off for that logger.
+"""
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from .config import settings
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with `extra` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Plain lines for local runs, with `extra` fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{key}={value}" for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and not key.startswith("_")
+        )
+        return f"{line} {extras}" if extras else line
+
+class _EnqueueHandler(QueueHandler):
+    """
+    QueueHandler that only merges the message args and renders any
+    traceback before enqueueing; the listener thread does the formatting.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener: Optional[QueueListener] = None
+
+def configure_logging() -> None:
+    """Route the root logger through a queue and apply per-module levels"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JSONFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    log_queue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_EnqueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # SQLAlchemy names pool loggers after the pool class, which puts ours
+    # outside the "sqlalchemy" hierarchy it keeps at WARN
+    logging.getLogger("app.core.metrics.InstrumentedQueuePool").setLevel(logging.WARNING)
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def sampled(logger: logging.Logger, level: int = logging.DEBUG) -> bool:
+    """
+    Whether to emit a hot-path event: `level` is enabled for `logger` and
+    the event falls within LOG_SAMPLE_RATE. Guard the log call with it so a
+    disabled event builds no message or `extra` dict:
+
+        if sampled(logger):
+            logger.debug("Voucher verified", extra={"code": code})
+    """
+    return logger.isEnabledFor(level) and random.random() < settings.LOG_SAMPLE_RATE
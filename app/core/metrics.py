@@ -0,0 +1,224 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .query_counter import QueryCounter, count_queries
+
+# Seconds; checkout waits are usually sub-millisecond unless the pool is exhausted
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; request latency and database time per request or statement
+REQUEST_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# SQL statements per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+# Characters of the slowest statement kept per route
+STATEMENT_TEXT_LIMIT = 500
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus-style cumulative buckets"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict:
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+class PoolMetrics:
+    """Connection pool counters and histograms, fed from SQLAlchemy pool events"""
+
+    def __init__(self):
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.connection_hold = Histogram(POOL_WAIT_BUCKETS)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def instrument(self, engine) -> None:
+        """Attach pool event listeners to a (sync or async) engine"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            self.connection_hold.observe(time.perf_counter() - checked_out_at)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def snapshot(self, pool) -> Dict:
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "connection_hold_seconds": self.connection_hold.snapshot(),
+        }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long each checkout waited.
+
+    SQLAlchemy has no "before checkout" event, so the wait is timed around
+    the pool's own get; the time spent opening a new overflow connection
+    is included.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.checkout_timeouts += 1
+            raise
+        finally:
+            pool_metrics.checkout_wait.observe(time.perf_counter() - start)
+
+class RouteMetrics:
+    """Latency and SQL cost of the requests to one method and route template"""
+
+    def __init__(self):
+        self.duration = Histogram(REQUEST_SECONDS_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram(REQUEST_SECONDS_BUCKETS)
+        self.slowest_query = Histogram(REQUEST_SECONDS_BUCKETS)
+        self.responses: Dict[int, int] = {}
+        # Slowest single statement seen on this route since startup
+        self.slowest_statement: Optional[str] = None
+        self.slowest_statement_seconds = 0.0
+
+    def observe(self, status: int, seconds: float, queries: QueryCounter) -> None:
+        self.responses[status] = self.responses.get(status, 0) + 1
+        self.duration.observe(seconds)
+        self.queries.observe(queries.count)
+        self.db_time.observe(queries.seconds)
+        if queries.count:
+            self.slowest_query.observe(queries.slowest_seconds)
+        if queries.slowest_seconds > self.slowest_statement_seconds:
+            self.slowest_statement_seconds = queries.slowest_seconds
+            self.slowest_statement = " ".join(queries.slowest_statement.split())[:STATEMENT_TEXT_LIMIT]
+
+    def snapshot(self) -> Dict:
+        return {
+            "responses": {str(status): count for status, count in sorted(self.responses.items())},
+            "duration_seconds": self.duration.snapshot(),
+            "queries": self.queries.snapshot(),
+            "db_seconds": self.db_time.snapshot(),
+            "slowest_query_seconds": self.slowest_query.snapshot(),
+            "slowest_statement": self.slowest_statement,
+            "slowest_statement_seconds": self.slowest_statement_seconds,
+        }
+
+class RequestMetrics:
+    """Per-route request metrics, fed by RequestMetricsMiddleware"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, queries: QueryCounter) -> None:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.observe(status, seconds, queries)
+
+    def snapshot(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "routes": {
+                f"{method} {route}": metrics.snapshot()
+                for (method, route), metrics in sorted(self.routes.items())
+            },
+        }
+
+request_metrics = RequestMetrics()
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, SQL statement count, database
+    time and slowest statement for every HTTP request.
+
+    Requests are labelled with their route template (not the raw path) to
+    keep the number of series bounded; unrouted requests share one label.
+    A request is recorded once its last body chunk is sent, so background
+    tasks run after the response don't count towards its latency.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status = 500
+        recorded = False
+        request_metrics.in_flight += 1
+
+        with count_queries(record_statements=False) as queries:
+            def record() -> None:
+                nonlocal recorded
+                recorded = True
+                request_metrics.in_flight -= 1
+                route = scope.get("route")
+                request_metrics.observe(
+                    scope["method"],
+                    route.path if route is not None else "unmatched",
+                    status,
+                    time.perf_counter() - started_at,
+                    queries
+                )
+
+            async def send_and_record(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                await send(message)
+                if (
+                    message["type"] == "http.response.body"
+                    and not message.get("more_body", False)
+                    and not recorded
+                ):
+                    record()
+
+            try:
+                await self.app(scope, receive, send_and_record)
+            finally:
+                if not recorded:
+                    record()
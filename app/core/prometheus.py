@@ -0,0 +1,108 @@
+"""Prometheus text exposition (format 0.0.4) of the in-process metrics."""
+from typing import Dict, Iterable, List, Tuple
+from .bloom import voucher_filter
+from .cache import verify_cache
+from .database import engine
+from .metrics import Histogram, pool_metrics, request_metrics
+from .security import admin_cache
+from app.utils.voucher_lookup import company_cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Sample = Tuple[Dict[str, str], float]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsWriter:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def _header(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[Sample]) -> None:
+        self._samples(name, "gauge", help_text, samples)
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Sample]) -> None:
+        self._samples(name, "counter", help_text, samples)
+
+    def _samples(self, name: str, kind: str, help_text: str, samples: Iterable[Sample]) -> None:
+        self._header(name, kind, help_text)
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], Histogram]]) -> None:
+        self._header(name, "histogram", help_text)
+        for labels, histogram in samples:
+            running = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                running += count
+                self.lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {running}")
+            self.lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+            self.lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+            self.lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+def render_metrics() -> str:
+    """Requests, connection pool, caches and Bloom filters in Prometheus text format"""
+    out = MetricsWriter()
+
+    routes = sorted(request_metrics.routes.items())
+    route_labels = [({"method": method, "route": route}, metrics) for (method, route), metrics in routes]
+    out.gauge("http_requests_in_flight", "HTTP requests currently being served.", [({}, request_metrics.in_flight)])
+    out.counter("http_requests_total", "HTTP responses by route and status.", (
+        ({**labels, "status": str(status)}, count)
+        for labels, metrics in route_labels
+        for status, count in sorted(metrics.responses.items())
+    ))
+    out.histogram("http_request_duration_seconds", "HTTP request latency until the last body chunk was sent.", (
+        (labels, metrics.duration) for labels, metrics in route_labels
+    ))
+    out.histogram("http_request_db_queries", "SQL statements run per HTTP request.", (
+        (labels, metrics.queries) for labels, metrics in route_labels
+    ))
+    out.histogram("http_request_db_seconds", "Time spent executing SQL per HTTP request.", (
+        (labels, metrics.db_time) for labels, metrics in route_labels
+    ))
+    out.histogram("http_request_db_slowest_query_seconds", "Slowest SQL statement per HTTP request that ran any.", (
+        (labels, metrics.slowest_query) for labels, metrics in route_labels
+    ))
+
+    pool = engine.pool
+    out.gauge("db_pool_size", "Configured connection pool size.", [({}, pool.size())])
+    out.gauge("db_pool_checked_out", "Connections currently checked out.", [({}, pool.checkedout())])
+    out.gauge("db_pool_overflow", "Overflow connections currently open.", [({}, max(pool.overflow(), 0))])
+    out.counter("db_pool_checkouts_total", "Connection checkouts.", [({}, pool_metrics.checkouts)])
+    out.counter("db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection.", [({}, pool_metrics.checkout_timeouts)])
+    out.counter("db_pool_connects_total", "New database connections opened.", [({}, pool_metrics.connects)])
+    out.counter("db_pool_invalidations_total", "Connections invalidated.", [({}, pool_metrics.invalidations)])
+    out.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", [({}, pool_metrics.checkout_wait)])
+    out.histogram("db_pool_connection_hold_seconds", "Time connections were held before check-in.", [({}, pool_metrics.connection_hold)])
+
+    caches = [({"cache": "admin"}, admin_cache), ({"cache": "verify"}, verify_cache), ({"cache": "company"}, company_cache)]
+    out.gauge("cache_entries", "Entries held by an in-process cache.", ((labels, len(cache)) for labels, cache in caches))
+    out.counter("cache_hits_total", "In-process cache hits.", ((labels, cache.hits) for labels, cache in caches))
+    out.counter("cache_misses_total", "In-process cache misses.", ((labels, cache.misses) for labels, cache in caches))
+    out.counter("cache_invalidations_total", "In-process cache invalidations.", ((labels, cache.invalidations) for labels, cache in caches))
+
+    filters = voucher_filter.filters.values()
+    out.gauge("voucher_bloom_companies", "Companies with a voucher code filter.", [({}, len(voucher_filter.filters))])
+    out.gauge("voucher_bloom_codes", "Voucher codes tracked by the filters.", [({}, sum(bloom.count for bloom in filters))])
+    out.gauge("voucher_bloom_bytes", "Memory used by the filter bit arrays.", [({}, sum(bloom.nbytes for bloom in filters))])
+    out.counter("voucher_bloom_definite_misses_total", "Lookups of codes not in the filter, kept out of the verify cache.", [({}, voucher_filter.definite_misses)])
+    out.counter("voucher_bloom_refreshes_total", "Incremental filter refreshes.", [({}, voucher_filter.refreshes)])
+    out.counter("voucher_bloom_rebuilds_total", "Full or per-company filter rebuilds.", [({}, voucher_filter.rebuilds)])
+
+    return out.render()
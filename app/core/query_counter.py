@@ -0,0 +1,108 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from .config import settings
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block or route runs more SQL statements than allowed"""
+
+class QueryCounter:
+    """
+    SQL statements sent to the database while the counter is active, with
+    their total and slowest execution time. Statement text is only kept
+    when `record_statements` is set.
+    """
+
+    def __init__(self, record_statements: bool = True):
+        self.record_statements = record_statements
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: List[str] = []
+
+    def started(self, statement: str) -> None:
+        self.count += 1
+        if self.record_statements:
+            self.statements.append(statement)
+
+    def finished(self, statement: str, seconds: float) -> None:
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def report(self) -> str:
+        return "\n".join(
+            f"{number}. {' '.join(statement.split())}"
+            for number, statement in enumerate(self.statements, start=1)
+        )
+
+# Counters active in the current task; nested blocks each see every statement
+_active_counters: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("active_query_counters", default=())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counters = _active_counters.get()
+    if not counters:
+        return
+    # Counted here so statements that fail still count against budgets
+    for counter in counters:
+        counter.started(statement)
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+    seconds = time.perf_counter() - started_at
+    for counter in _active_counters.get():
+        counter.finished(statement, seconds)
+
+def instrument(engine) -> None:
+    """Attach the statement counter to a (sync or async) engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+@contextmanager
+def count_queries(record_statements: bool = True) -> Iterator[QueryCounter]:
+    """Count the statements run by the current task inside the block"""
+    counter = QueryCounter(record_statements)
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+@contextmanager
+def assert_max_queries(max_statements: int) -> Iterator[QueryCounter]:
+    """Raise QueryBudgetExceeded if the block runs more than `max_statements`"""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_statements:
+        raise QueryBudgetExceeded(
+            f"{counter.count} SQL statements run, budget is {max_statements}:\n{counter.report()}"
+        )
+
+def query_budget(max_statements: int):
+    """
+    Route dependency capping the statements one request may run, enforced
+    only when QUERY_BUDGETS_ENFORCED is set:
+
+        @router.get("/", dependencies=[Depends(query_budget(2))])
+
+    Route dependencies are solved before the endpoint's own, so auth and
+    session setup count too. The check runs on teardown, after the response
+    has been sent, so a regression surfaces as an exception raised out of
+    the app (failing the calling test) rather than as an error response.
+    """
+    async def enforce_query_budget():
+        if not settings.QUERY_BUDGETS_ENFORCED:
+            yield
+            return
+        with assert_max_queries(max_statements):
+            yield
+    return enforce_query_budget
@@ -0,0 +1,27 @@
+from typing import Any
+from uuid import UUID
+import orjson
+from fastapi.responses import ORJSONResponse
+
+def _encode_default(value: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson only encodes via default
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson-encoded response for endpoints that return plain rows.
+
+    Content is encoded as given, without a pass through the response model,
+    so it must already be built from JSON-ready values (str, int, UUID,
+    datetime, None, dicts and lists of those). UTC datetimes are written
+    with a `Z` suffix to match the pydantic-encoded responses.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_encode_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        )
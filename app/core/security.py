@@ -1,26 +1,73 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Optional, Tuple
 from .config import settings
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.logging import sampled
 from app.core.database import get_db
 from app.models import models
 from uuid import UUID
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max rounds to the configured cost makes passlib flag hashes
+# of any other cost for update, in either direction.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+# bcrypt releases the GIL, so hashing on a small thread pool keeps the event
+# loop free while capping how many CPU-bound hashes run concurrently.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
 SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = "HS256"
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# Admins resolved from token subjects, so authenticated requests usually
+# skip the admin lookup. Cached instances are detached from any session.
+admin_cache = TTLCache(maxsize=settings.ADMIN_CACHE_SIZE, ttl=settings.ADMIN_CACHE_TTL_SECONDS)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+@event.listens_for(models.Admin, "after_insert")
+@event.listens_for(models.Admin, "after_update")
+@event.listens_for(models.Admin, "after_delete")
+def invalidate_cached_admin(mapper, connection, target):
+    admin_cache.pop(target.email)
+    # An email change leaves the old subject cached under its previous value
+    for old_email in inspect(target).attrs.email.history.deleted:
+        admin_cache.pop(old_email)
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password off the event loop.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash should
+    be replaced because the configured bcrypt cost has changed.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def get_password_hash(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -30,9 +77,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 
 
-def get_current_admin(
+async def get_current_admin(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,19 +96,25 @@ def get_current_admin(
                 detail="Could not validate credentials",
             )
         
-        # Add debug logging
-        print(f"Token payload: {payload}")
-        print(f"Looking for admin with email: {email}")
-        
-        admin = db.query(models.Admin).filter(models.Admin.email == email).first()
+        admin = admin_cache.get(email)
+        if admin is not None:
+            return admin
+
+        admin = await db.scalar(select(models.Admin).where(models.Admin.email == email))
         if admin is None:
+            if sampled(logger):
+                logger.debug("Token subject is not an admin", extra={"email": email})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Admin not found",
             )
+        db.expunge(admin)
+        admin_cache.set(email, admin)
         return admin
     except JWTError as e:
-        print(f"JWT Error: {str(e)}")  # Debug log
+        # A flood of bad tokens must not turn into a flood of log lines
+        if sampled(logger):
+            logger.debug("Rejected token", extra={"error": str(e)})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -1,12 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.v1.endpoints import admin, attendant, voucher, company, branch
+from fastapi.responses import PlainTextResponse
+from app.api.v1.endpoints import admin, attendant, voucher, batch, company, branch, reports, system
+from app.core.bloom import voucher_filter
 from app.core.config import settings
 from app.core.database import engine
+from app.core.logging import configure_logging, stop_logging
+from app.core.metrics import RequestMetricsMiddleware
+from app.core.prometheus import CONTENT_TYPE, render_metrics
 from fastapi.middleware.cors import CORSMiddleware
 from app.models import models
+from app.utils.voucher_archive import run_archive_scheduler
 
-models.Base.metadata.create_all(bind=engine)
+configure_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    if settings.BLOOM_FILTER_ENABLED:
+        await voucher_filter.rebuild()
+    archiver = None
+    if settings.VOUCHER_ARCHIVE_INTERVAL_SECONDS > 0:
+        archiver = asyncio.create_task(run_archive_scheduler())
+    yield
+    if archiver is not None:
+        archiver.cancel()
+    voucher_filter.cancel_refresh()
+    await engine.dispose()
+    stop_logging()
 
 
 app = FastAPI(
@@ -38,6 +61,7 @@ app = FastAPI(
     license_info={
         "name": "Private",
     },
+    lifespan=lifespan,
 )
 
 # Tags metadata for better documentation organization
@@ -62,6 +86,18 @@ tags_metadata = [
         "name": "voucher",
         "description": "Voucher creation, verification, and usage operations.",
     },
+    {
+        "name": "batch",
+        "description": "Voucher batches: per-batch stats, export and invalidation.",
+    },
+    {
+        "name": "reports",
+        "description": "Redemption time series and rankings served from precomputed rollups.",
+    },
+    {
+        "name": "system",
+        "description": "Operational metrics such as database pool and cache usage. Admin only.",
+    },
 ]
 
 app.add_middleware(
@@ -72,6 +108,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
 app.openapi_tags = tags_metadata
 
 # Include routers
@@ -80,6 +119,9 @@ app.include_router(company.router, prefix="/api/v1/company", tags=["company"])
 app.include_router(branch.router, prefix="/api/v1/branch", tags=["branch"])
 app.include_router(attendant.router, prefix="/api/v1/attendant", tags=["attendant"])
 app.include_router(voucher.router, prefix="/api/v1/voucher", tags=["voucher"])
+app.include_router(batch.router, prefix="/api/v1/batch", tags=["batch"])
+app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
+app.include_router(system.router, prefix="/api/v1/system", tags=["system"])
 
 @app.get("/", tags=["root"])
 async def root():
@@ -91,4 +133,10 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs or /redoc",
         "status": "operational"
-    }
\ No newline at end of file
+    }
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Request, database pool, cache and Bloom filter metrics for Prometheus"""
+        return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,18 +1,24 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, func, Text
+from sqlalchemy import BigInteger, Column, Enum, Identity, Index, Integer, String, ForeignKey, DateTime, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import uuid
+from app.core.config import settings
 
 Base = declarative_base()
 
+# Native Postgres enum: 4 bytes per row instead of a variable-length text value
+voucher_status = Enum("active", "used", "invalid", name="voucher_status")
+# How a company's new voucher codes are formed; see app/utils/voucher_generator.py
+code_scheme = Enum("plain", "hmac", name="code_scheme")
+
 class Branch(Base):
     __tablename__ = "branch"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
     location = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    attendants = relationship("Attendant", back_populates="branch")
+    attendants = relationship("Attendant", back_populates="branch", lazy="raise_on_sql")
 
 class Admin(Base):
     __tablename__ = "admin"
@@ -26,29 +32,118 @@ class Company(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
     acronym = Column(String(10), unique=True, nullable=False)
+    code_scheme = Column(code_scheme, nullable=False, default="plain", server_default="plain")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    vouchers = relationship("Voucher", back_populates="company")
+    vouchers = relationship("Voucher", back_populates="company", lazy="raise_on_sql")
 
 class Attendant(Base):
     __tablename__ = "attendant"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False)
     passcode = Column(String(255), nullable=False)
-    branch_id = Column(UUID(as_uuid=True), ForeignKey("branch.id"), nullable=False)
+    branch_id = Column(UUID(as_uuid=True), ForeignKey("branch.id"), nullable=False, index=True)
     created_by = Column(UUID(as_uuid=True), ForeignKey("admin.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    branch = relationship("Branch", back_populates="attendants")
-    vouchers = relationship("Voucher", back_populates="attendant")
+    branch = relationship("Branch", back_populates="attendants", lazy="raise_on_sql")
+    vouchers = relationship("Voucher", back_populates="attendant", lazy="raise_on_sql")
 
 class Voucher(Base):
     __tablename__ = "voucher"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    code = Column(String(20), unique=True, nullable=False)
+    if settings.VOUCHER_BIGINT_KEY:
+        # Compact internal key; the UUID stays the identifier exposed by the API
+        pk = Column(BigInteger, Identity(), primary_key=True)
+        id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
+    else:
+        id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    code = Column(String(20), nullable=False)
     company_id = Column(UUID(as_uuid=True), ForeignKey("company.id"), nullable=False)
-    status = Column(Text, default='active')
-    used_by = Column(UUID(as_uuid=True), ForeignKey("attendant.id"), nullable=True)
+    # The code's base-36 suffix as an integer; (company_id, suffix_int) is unique
+    suffix_int = Column(BigInteger, nullable=False)
+    status = Column(voucher_status, nullable=False, default="active", server_default="active")
+    used_by = Column(UUID(as_uuid=True), ForeignKey("attendant.id"), nullable=True, index=True)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    # The attendant's branch at redemption; rollups stay attributed to it if they move
+    used_branch_id = Column(UUID(as_uuid=True), ForeignKey("branch.id"), nullable=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("admin.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("voucher_batch.id"), nullable=True, index=True)
+    company = relationship("Company", back_populates="vouchers", lazy="raise_on_sql")
+    attendant = relationship("Attendant", back_populates="vouchers", lazy="raise_on_sql")
+    batch = relationship("VoucherBatch", back_populates="vouchers", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Code lookups: the acronym prefix resolves to company_id
+        Index("ux_voucher_company_suffix", "company_id", "suffix_int", unique=True),
+        # Status filters and counter reconciliation within a company
+        Index("ix_voucher_company_status", "company_id", "status"),
+        # Keyset pagination: per company and across all companies
+        Index("ix_voucher_company_created", "company_id", created_at.desc(), (pk if settings.VOUCHER_BIGINT_KEY else id).desc()),
+        Index("ix_voucher_created", created_at.desc(), (pk if settings.VOUCHER_BIGINT_KEY else id).desc()),
+        # Active vouchers are the hot subset for listings and bulk invalidation
+        Index(
+            "ix_voucher_active_company_created",
+            "company_id", "created_at",
+            postgresql_where=(status == "active"),
+        ),
+        # Finished vouchers by age, for the archival job
+        Index(
+            "ix_voucher_archivable",
+            func.coalesce(used_at, created_at),
+            postgresql_where=(status != "active"),
+        ),
+    )
+
+class VoucherArchive(Base):
+    """
+    Used and invalid vouchers moved out of the hot voucher table once past
+    the retention window. Same columns as Voucher, less any bigint pk; no
+    foreign keys, so archived rows never hold up writes to the tables they
+    refer to.
+    """
+    __tablename__ = "voucher_archive"
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    code = Column(String(20), nullable=False)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    suffix_int = Column(BigInteger, nullable=False)
+    status = Column(voucher_status, nullable=False)
+    used_by = Column(UUID(as_uuid=True), nullable=True)
     used_at = Column(DateTime(timezone=True), nullable=True)
+    used_branch_id = Column(UUID(as_uuid=True), nullable=True)
+    created_by = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    batch_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ux_voucher_archive_company_suffix", "company_id", "suffix_int", unique=True),
+    )
+
+# The voucher primary key, which breaks created_at ties in keyset pagination
+VOUCHER_KEY = Voucher.pk if settings.VOUCHER_BIGINT_KEY else Voucher.id
+
+class VoucherBatch(Base):
+    """A group of vouchers issued together by one create request"""
+    __tablename__ = "voucher_batch"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id"), nullable=False)
+    size = Column(Integer, nullable=False)
     created_by = Column(UUID(as_uuid=True), ForeignKey("admin.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    company = relationship("Company", back_populates="vouchers")
-    attendant = relationship("Attendant", back_populates="vouchers")
\ No newline at end of file
+    vouchers = relationship("Voucher", back_populates="batch", lazy="raise_on_sql")
+
+class RedemptionRollup(Base):
+    """Redemptions per company, branch, attendant and UTC hour, kept in step with use and revert"""
+    __tablename__ = "redemption_rollup"
+    # Company and hour lead the key so report range scans stay on the primary key
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id"), primary_key=True)
+    hour = Column(DateTime(timezone=True), primary_key=True)
+    branch_id = Column(UUID(as_uuid=True), ForeignKey("branch.id"), primary_key=True)
+    attendant_id = Column(UUID(as_uuid=True), ForeignKey("attendant.id"), primary_key=True)
+    count = Column(BigInteger, nullable=False, server_default="0")
+
+class VoucherCounter(Base):
+    """Per-company, per-status voucher counts, kept in step with every status change"""
+    __tablename__ = "voucher_counters"
+    company_id = Column(UUID(as_uuid=True), ForeignKey("company.id"), primary_key=True)
+    status = Column(voucher_status, primary_key=True)
+    count = Column(BigInteger, nullable=False, server_default="0")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from enum import Enum
 
@@ -9,6 +9,10 @@ class VoucherStatus(str, Enum):
     used = "used"
     invalid = "invalid"
 
+class CodeScheme(str, Enum):
+    plain = "plain"
+    hmac = "hmac"
+
 # Base schemas
 class BranchBase(BaseModel):
     name: str
@@ -61,6 +65,7 @@ class Admin(AdminBase):
 
 class Company(CompanyBase):
     id: UUID
+    code_scheme: CodeScheme = CodeScheme.plain
     created_at: datetime
 
     class Config:
@@ -82,6 +87,29 @@ class Voucher(VoucherBase):
     used_at: Optional[datetime]
     created_by: UUID
     created_at: datetime
+    batch_id: Optional[UUID] = None
+
+    class Config:
+        from_attributes = True
+
+class VoucherPage(BaseModel):
+    items: List[Voucher]
+    next_cursor: Optional[str] = None
+
+class VoucherBulkSelection(BaseModel):
+    """Either an explicit code list or a company/status/creation-window filter"""
+    codes: Optional[List[str]] = None
+    company_id: Optional[UUID] = None
+    status: Optional[VoucherStatus] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+class VoucherBatch(BaseModel):
+    id: UUID
+    company_id: UUID
+    size: int
+    created_by: UUID
+    created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
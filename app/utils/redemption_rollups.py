@@ -0,0 +1,87 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Mapping, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import models
+
+RollupKey = Tuple[UUID, datetime, UUID, UUID]
+
+def hour_bucket(moment: datetime) -> datetime:
+    """The UTC hour containing `moment`"""
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def redemption(
+    company_id: UUID,
+    branch_id: UUID,
+    attendant_id: UUID,
+    used_at: datetime,
+    count: int = 1
+) -> Counter:
+    """
+    Rollup deltas for `count` redemptions; pass a negative count for reverts.
+
+    Combine several with Counter.update(); `+` would drop the negative deltas.
+    """
+    return Counter({(company_id, hour_bucket(used_at), branch_id, attendant_id): count})
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Mapping[RollupKey, int]) -> None:
+    """
+    Add the deltas to redemption_rollup with one multi-row upsert.
+
+    Must run in the same transaction as the redemptions it accounts for.
+    Rows are written in key order so concurrent transactions can't deadlock.
+    """
+    rows = [
+        {"company_id": company_id, "hour": hour, "branch_id": branch_id, "attendant_id": attendant_id, "count": delta}
+        for (company_id, hour, branch_id, attendant_id), delta in sorted(deltas.items(), key=lambda item: tuple(map(str, item[0])))
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = insert(models.RedemptionRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            models.RedemptionRollup.company_id,
+            models.RedemptionRollup.hour,
+            models.RedemptionRollup.branch_id,
+            models.RedemptionRollup.attendant_id,
+        ],
+        set_={"count": models.RedemptionRollup.count + stmt.excluded["count"]}
+    )
+    await db.execute(stmt)
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """
+    Recompute redemption_rollup from live and archived vouchers.
+
+    A redemption counts until it is reverted, so used vouchers that were
+    later invalidated still count. Rollup writes are blocked meanwhile.
+    Returns the number of rollup rows written.
+    """
+    await db.execute(text("LOCK TABLE redemption_rollup IN SHARE ROW EXCLUSIVE MODE"))
+    redeemed = union_all(*(
+        select(table.company_id, table.used_branch_id, table.used_by, table.used_at)
+        .where(table.used_at.is_not(None))
+        for table in (models.Voucher, models.VoucherArchive)
+    )).subquery()
+    hour = func.date_trunc("hour", redeemed.c.used_at, "UTC")
+    rollups = (
+        select(
+            redeemed.c.company_id,
+            hour,
+            redeemed.c.used_branch_id,
+            redeemed.c.used_by,
+            func.count()
+        )
+        .group_by(redeemed.c.company_id, hour, redeemed.c.used_branch_id, redeemed.c.used_by)
+    )
+    await db.execute(delete(models.RedemptionRollup))
+    written = (await db.execute(
+        insert(models.RedemptionRollup)
+        .from_select(["company_id", "hour", "branch_id", "attendant_id", "count"], rollups)
+    )).rowcount
+    await db.commit()
+    return written
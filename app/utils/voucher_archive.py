@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+# Vouchers moved per transaction; bounds lock time and WAL per commit
+ARCHIVE_CHUNK_SIZE = 1000
+
+ARCHIVED_COLUMNS = [
+    column.key for column in models.VoucherArchive.__table__.columns
+    if column.key != "archived_at"
+]
+
+async def archive_chunk(db: AsyncSession, cutoff_days: int, chunk_size: int = ARCHIVE_CHUNK_SIZE) -> int:
+    """
+    Move one chunk of finished vouchers older than the cutoff into
+    voucher_archive with a single DELETE ... RETURNING feeding an INSERT.
+
+    Rows locked by in-flight transactions are skipped, so concurrent runs
+    and live traffic don't wait on each other. Counters are left alone:
+    archived vouchers still count towards their company's totals.
+    """
+    voucher = models.Voucher.__table__
+    key = voucher.c[models.VOUCHER_KEY.key]
+    picked = (
+        select(key)
+        .where(
+            voucher.c.status != "active",
+            func.coalesce(voucher.c.used_at, voucher.c.created_at)
+            < func.now() - timedelta(days=cutoff_days)
+        )
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
+        .cte("picked")
+    )
+    moved = (
+        delete(voucher)
+        .where(key.in_(select(picked.c[key.key])))
+        .returning(*(voucher.c[key] for key in ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    archived = (await db.execute(
+        insert(models.VoucherArchive.__table__)
+        .from_select(ARCHIVED_COLUMNS, select(*(moved.c[key] for key in ARCHIVED_COLUMNS)))
+        .returning(models.VoucherArchive.id)
+    )).all()
+    await db.commit()
+    return len(archived)
+
+async def archive_vouchers(
+    cutoff_days: Optional[int] = None,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE
+) -> int:
+    """Archive every eligible voucher, one chunk per transaction; returns the count moved"""
+    if cutoff_days is None:
+        cutoff_days = settings.VOUCHER_ARCHIVE_RETENTION_DAYS
+    total = 0
+    async with SessionLocal() as db:
+        while True:
+            moved = await archive_chunk(db, cutoff_days, chunk_size)
+            total += moved
+            if moved < chunk_size:
+                logger.info("Vouchers archived", extra={"archived": total, "cutoff_days": cutoff_days})
+                return total
+
+async def run_archive_scheduler() -> None:
+    """Archive on a fixed interval for as long as the app runs"""
+    while True:
+        await asyncio.sleep(settings.VOUCHER_ARCHIVE_INTERVAL_SECONDS)
+        try:
+            await archive_vouchers()
+        except Exception:
+            # Try again next interval rather than stopping archival for good
+            logger.exception("Voucher archival failed")
@@ -0,0 +1,127 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import verify_cache
+from app.core.database import SessionLocal
+from app.core.jobs import Job
+from app.models import models
+from app.utils.redemption_rollups import apply_rollup_deltas, redemption
+from app.utils.voucher_counters import apply_counter_deltas, transition
+from app.utils.voucher_lookup import resolve_voucher_codes, voucher_keys_in
+from app.utils.voucher_query import VoucherFilters
+
+# Vouchers locked and updated per transaction; bounds how long row locks are held
+BULK_CHUNK_SIZE = 1000
+
+@dataclass(frozen=True)
+class BulkTransition:
+    """A status change applied to many vouchers at once"""
+    kind: str
+    from_statuses: Tuple[str, ...]
+    to_status: str
+    changes: Dict = field(default_factory=dict)
+    # Whether the change undoes the redemption, taking it out of the rollups
+    reverts_redemption: bool = False
+
+INVALIDATE = BulkTransition("invalidate", ("active", "used"), "invalid", {"status": "invalid"})
+REVERT = BulkTransition(
+    "revert", ("used",), "active", {"status": "active", "used_by": None, "used_at": None, "used_branch_id": None},
+    reverts_redemption=True
+)
+
+def _candidates(operation: BulkTransition) -> Select:
+    return select(
+        models.VOUCHER_KEY.label("voucher_key"),
+        models.Voucher.status.label("previous_status"),
+        models.Voucher.used_by.label("previous_used_by"),
+        models.Voucher.used_at.label("previous_used_at"),
+        models.Voucher.used_branch_id.label("previous_branch_id")
+    ).where(models.Voucher.status.in_(operation.from_statuses))
+
+async def _apply_chunk(db: AsyncSession, operation: BulkTransition, picked: Select) -> List:
+    """Lock the picked vouchers, update them in one statement and commit"""
+    picked = picked.with_for_update().cte("picked")
+    rows = (await db.execute(
+        update(models.Voucher.__table__)
+        .where(models.VOUCHER_KEY == picked.c.voucher_key)
+        .values(**operation.changes)
+        .returning(
+            models.Voucher.code,
+            models.Voucher.company_id,
+            picked.c.previous_status,
+            picked.c.previous_used_by,
+            picked.c.previous_used_at,
+            picked.c.previous_branch_id
+        )
+    )).all()
+
+    deltas = Counter()
+    rollup_deltas = Counter()
+    for row in rows:
+        deltas.update(transition(row.company_id, row.previous_status, operation.to_status))
+        if operation.reverts_redemption and row.previous_used_by is not None and row.previous_used_at is not None:
+            rollup_deltas.update(redemption(
+                row.company_id, row.previous_branch_id, row.previous_used_by, row.previous_used_at, -1
+            ))
+    await apply_counter_deltas(db, deltas)
+    await apply_rollup_deltas(db, rollup_deltas)
+    await db.commit()
+    for row in rows:
+        verify_cache.pop(row.code)
+    return rows
+
+async def run_bulk_transition(
+    job: Job,
+    operation: BulkTransition,
+    codes: Optional[Iterable[str]] = None,
+    company_id: Optional[UUID] = None,
+    batch_id: Optional[UUID] = None,
+    filters: Optional[VoucherFilters] = None
+) -> Job:
+    """
+    Apply `operation` to the given codes, or to every voucher matching the
+    company, batch and filters, in chunks of BULK_CHUNK_SIZE.
+
+    Each chunk is its own transaction, so locks are held briefly and
+    progress is recorded on `job` as the run proceeds. Vouchers not in one
+    of the operation's source statuses are skipped.
+    """
+    try:
+        async with SessionLocal() as db:
+            if codes is not None:
+                codes = sorted({code.upper() for code in codes})
+                job.total = len(codes)
+                for start in range(0, len(codes), BULK_CHUNK_SIZE):
+                    chunk = codes[start:start + BULK_CHUNK_SIZE]
+                    keys = await resolve_voucher_codes(db, chunk)
+                    rows = []
+                    if keys:
+                        rows = await _apply_chunk(
+                            db, operation, _candidates(operation).where(voucher_keys_in(keys.values()))
+                        )
+                    job.processed += len(chunk)
+                    job.affected += len(rows)
+            else:
+                matching = _candidates(operation)
+                if company_id is not None:
+                    matching = matching.where(models.Voucher.company_id == company_id)
+                if batch_id is not None:
+                    matching = matching.where(models.Voucher.batch_id == batch_id)
+                if filters is not None:
+                    matching = filters.apply(matching)
+                job.total = await db.scalar(select(func.count()).select_from(matching.subquery()))
+                await db.commit()
+                # Updated rows leave the source statuses, so each pass picks up fresh ones
+                while True:
+                    rows = await _apply_chunk(db, operation, matching.limit(BULK_CHUNK_SIZE))
+                    if not rows:
+                        break
+                    job.processed += len(rows)
+                    job.affected += len(rows)
+        job.finish()
+    except Exception as e:
+        job.finish(error=str(e))
+    return job
@@ -0,0 +1,101 @@
+from collections import Counter
+from typing import Dict, Hashable, List, Mapping, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import models
+
+CounterKey = Tuple[UUID, str]
+
+def transition(company_id: UUID, from_status: Optional[str], to_status: str, count: int = 1) -> Counter:
+    """
+    Counter deltas for `count` vouchers moving from one status to another.
+
+    Combine several with Counter.update(); `+` would drop the negative deltas.
+    """
+    deltas = Counter()
+    if from_status is not None:
+        deltas[(company_id, from_status)] -= count
+    deltas[(company_id, to_status)] += count
+    return deltas
+
+async def apply_counter_deltas(db: AsyncSession, deltas: Mapping[CounterKey, int]) -> None:
+    """
+    Add the deltas to voucher_counters with one multi-row upsert.
+
+    Must run in the same transaction as the status change it accounts for.
+    Rows are written in key order so concurrent transactions lock counter
+    rows in the same order and can't deadlock on each other.
+    """
+    rows = [
+        {"company_id": company_id, "status": status, "count": delta}
+        for (company_id, status), delta in sorted(deltas.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = insert(models.VoucherCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.VoucherCounter.company_id, models.VoucherCounter.status],
+        set_={"count": models.VoucherCounter.count + stmt.excluded["count"]}
+    )
+    await db.execute(stmt)
+
+async def reconcile_counters(db: AsyncSession, fix: bool = True) -> List[Dict]:
+    """
+    Recount live and archived vouchers and report counters that drifted.
+
+    Counter writes are blocked for the duration so the recount and the
+    rewrite see the same state. With fix=False nothing is changed.
+    """
+    await db.execute(text("LOCK TABLE voucher_counters IN SHARE ROW EXCLUSIVE MODE"))
+
+    # Archived vouchers still count towards their company's totals
+    vouchers = union_all(
+        select(models.Voucher.company_id, models.Voucher.status),
+        select(models.VoucherArchive.company_id, models.VoucherArchive.status)
+    ).subquery()
+    actual: Dict[Hashable, int] = {
+        (row.company_id, row.status): row.count
+        for row in (await db.execute(
+            select(vouchers.c.company_id, vouchers.c.status, func.count().label("count"))
+            .group_by(vouchers.c.company_id, vouchers.c.status)
+        )).all()
+    }
+    stored: Dict[Hashable, int] = {
+        (row.company_id, row.status): row.count
+        for row in (await db.execute(
+            select(
+                models.VoucherCounter.company_id,
+                models.VoucherCounter.status,
+                models.VoucherCounter.count
+            )
+        )).all()
+    }
+
+    drift = [
+        {
+            "company_id": company_id,
+            "status": status,
+            "stored": stored.get((company_id, status), 0),
+            "actual": actual.get((company_id, status), 0),
+        }
+        for company_id, status in sorted(set(actual) | set(stored), key=lambda key: (str(key[0]), str(key[1])))
+        if stored.get((company_id, status), 0) != actual.get((company_id, status), 0)
+    ]
+
+    if fix and drift:
+        await db.execute(delete(models.VoucherCounter))
+        # With no vouchers left only stale counters remain; an empty
+        # values() would compile to INSERT ... DEFAULT VALUES
+        if actual:
+            await db.execute(insert(models.VoucherCounter).values([
+                {"company_id": company_id, "status": status, "count": count}
+                for (company_id, status), count in actual.items()
+            ]))
+    if fix:
+        await db.commit()
+    else:
+        await db.rollback()
+    return drift
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterable, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, CompoundSelect, select, union_all
+from app.core.database import SessionLocal
+from app.models import models
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_FIELDS = [
+    "id",
+    "code",
+    "company_id",
+    "status",
+    "used_by",
+    "used_at",
+    "created_by",
+    "created_at",
+    "batch_id",
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def export_select(where: Callable[[type], Iterable[ColumnElement[bool]]] = lambda table: ()) -> CompoundSelect:
+    """
+    Column-only select of the exported fields over live and archived
+    vouchers; `where(table)` gives the criteria for each of the two tables
+    """
+    return union_all(*(
+        select(*(getattr(table, field) for field in EXPORT_FIELDS)).where(*where(table))
+        for table in (models.Voucher, models.VoucherArchive)
+    ))
+
+def _export_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def _stream_partitions(stmt: CompoundSelect) -> AsyncIterator[Sequence]:
+    # The export outlives the request's dependency-scoped session, so it
+    # opens its own and reads through a server-side cursor in fixed chunks.
+    async with SessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+async def _ndjson_chunks(stmt: CompoundSelect) -> AsyncIterator[str]:
+    async for rows in _stream_partitions(stmt):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, map(_export_value, row)))) + "\n"
+            for row in rows
+        )
+
+async def _csv_chunks(stmt: CompoundSelect) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+    async for rows in _stream_partitions(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_export_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+def export_response(stmt: CompoundSelect, export_format: str, filename: str) -> StreamingResponse:
+    """Stream the rows of `stmt` (built from export_select) as NDJSON or CSV"""
+    chunks = _csv_chunks(stmt) if export_format == "csv" else _ndjson_chunks(stmt)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
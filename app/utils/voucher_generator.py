@@ -1,8 +1,96 @@
+import hashlib
+import hmac
 import random
 import string
+from typing import Iterable, Optional, Set, Tuple
+from app.core.config import settings
 
-def generate_voucher_code(company_acronym: str, code_length: int = 6) -> str:
+# Code suffixes are base-36 numbers of a fixed width; the digit order here
+# defines the integer stored in voucher.suffix_int.
+SUFFIX_ALPHABET = string.digits + string.ascii_uppercase
+SUFFIX_WIDTH = 6
+
+# Codes of companies on the "hmac" scheme end in CHECK_WIDTH extra characters
+# derived from VOUCHER_CODE_SECRET, so typos and forgeries fail in Python.
+CHECK_WIDTH = 2
+# Checked codes are stored above every plain suffix value, so a checked code
+# and a plain code can never share a (company_id, suffix_int) key.
+CHECKED_SUFFIX_OFFSET = 36 ** SUFFIX_WIDTH
+
+def encode_suffix(value: int, width: int = SUFFIX_WIDTH) -> str:
+    """Render `value` as a zero-padded base-36 suffix"""
+    digits = []
+    while value:
+        value, digit = divmod(value, 36)
+        digits.append(SUFFIX_ALPHABET[digit])
+    return "".join(reversed(digits)).rjust(width, SUFFIX_ALPHABET[0])
+
+def decode_suffix(suffix: str) -> int:
+    """Parse a base-36 suffix; raises ValueError on characters outside the alphabet"""
+    value = 0
+    for char in suffix:
+        digit = SUFFIX_ALPHABET.find(char)
+        if digit < 0:
+            raise ValueError(f"Invalid code character {char!r}")
+        value = value * 36 + digit
+    return value
+
+def check_characters(acronym: str, suffix: str) -> Optional[str]:
+    """Truncated HMAC of the code body, or None when no secret is configured"""
+    if not settings.VOUCHER_CODE_SECRET:
+        return None
+    digest = hmac.new(
+        settings.VOUCHER_CODE_SECRET.encode(), f"{acronym}-{suffix}".encode(), hashlib.sha256
+    ).digest()
+    return encode_suffix(int.from_bytes(digest[:8], "big") % 36 ** CHECK_WIDTH, CHECK_WIDTH)
+
+def split_voucher_code(code: str) -> Optional[Tuple[str, int]]:
+    """
+    Split an `ACRONYM-SUFFIX` code into its acronym and integer suffix.
+
+    Plain codes have a SUFFIX_WIDTH suffix. Checked codes carry CHECK_WIDTH
+    more characters, which must match the HMAC of the rest of the code.
+    Returns None for anything that could not have been issued, so callers
+    can answer "not found" without touching the database.
+    """
+    acronym, _, suffix = code.upper().rpartition("-")
+    if not acronym or len(suffix) not in (SUFFIX_WIDTH, SUFFIX_WIDTH + CHECK_WIDTH):
+        return None
+    body, check = suffix[:SUFFIX_WIDTH], suffix[SUFFIX_WIDTH:]
+    try:
+        suffix_int = decode_suffix(body)
+    except ValueError:
+        return None
+    if not check:
+        return acronym, suffix_int
+    expected = check_characters(acronym, body)
+    if expected is None or not hmac.compare_digest(check, expected):
+        return None
+    return acronym, CHECKED_SUFFIX_OFFSET + suffix_int
+
+def generate_voucher_code(company_acronym: str, code_length: int = 6, scheme: str = "plain") -> str:
     """Generate unique voucher code using company acronym and random characters"""
     chars = string.ascii_uppercase + string.digits
     random_str = ''.join(random.choice(chars) for _ in range(code_length))
-    return f"{company_acronym}-{random_str}"
\ No newline at end of file
+    if scheme == "hmac":
+        check = check_characters(company_acronym, random_str)
+        if check is None:
+            raise ValueError("VOUCHER_CODE_SECRET must be set to generate hmac scheme codes")
+        random_str += check
+    return f"{company_acronym}-{random_str}"
+
+def generate_voucher_codes(
+    company_acronym: str,
+    count: int,
+    code_length: int = 6,
+    exclude: Iterable[str] = (),
+    scheme: str = "plain"
+) -> Set[str]:
+    """Generate `count` distinct voucher codes in memory, skipping any in `exclude`"""
+    excluded = set(exclude)
+    codes = set()
+    while len(codes) < count:
+        code = generate_voucher_code(company_acronym, code_length, scheme)
+        if code not in excluded:
+            codes.add(code)
+    return codes
@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import event, inspect, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import models
+from app.utils.voucher_generator import split_voucher_code
+
+_NOT_CACHED = object()
+
+class VoucherKey(NamedTuple):
+    """Where a code lives in the (company_id, suffix_int) unique index"""
+    company_id: UUID
+    suffix_int: int
+
+# Acronym -> company id. Acronyms can't change once a company has vouchers,
+# so entries only go stale when companies are added or renamed, and those
+# writes invalidate them below. Unknown acronyms are cached as None briefly.
+company_cache = TTLCache(maxsize=settings.COMPANY_CACHE_SIZE, ttl=settings.COMPANY_CACHE_TTL_SECONDS)
+
+@event.listens_for(models.Company, "after_insert")
+@event.listens_for(models.Company, "after_update")
+@event.listens_for(models.Company, "after_delete")
+def invalidate_cached_company(mapper, connection, target):
+    company_cache.pop(target.acronym)
+    for old_acronym in inspect(target).attrs.acronym.history.deleted:
+        company_cache.pop(old_acronym)
+
+async def company_ids_for_acronyms(db: AsyncSession, acronyms: Iterable[str]) -> Dict[str, UUID]:
+    """Resolve acronyms to company ids, fetching all cache misses in one query"""
+    resolved = {}
+    missing = set()
+    for acronym in set(acronyms):
+        company_id = company_cache.get(acronym, _NOT_CACHED)
+        if company_id is _NOT_CACHED:
+            missing.add(acronym)
+        elif company_id is not None:
+            resolved[acronym] = company_id
+    if missing:
+        generation = company_cache.generation
+        found = dict((await db.execute(
+            select(models.Company.acronym, models.Company.id)
+            .where(models.Company.acronym.in_(missing))
+        )).all())
+        for acronym in missing:
+            if acronym in found:
+                company_cache.set_if_current(generation, acronym, found[acronym])
+            else:
+                company_cache.set_if_current(
+                    generation, acronym, None, ttl=settings.VERIFY_CACHE_NEGATIVE_TTL_SECONDS
+                )
+        resolved.update(found)
+    return resolved
+
+async def resolve_voucher_codes(db: AsyncSession, codes: Iterable[str]) -> Dict[str, VoucherKey]:
+    """
+    Map codes to their index keys. Malformed codes and codes whose acronym
+    matches no company are left out; they cannot exist.
+    """
+    parsed = {}
+    for code in codes:
+        split = split_voucher_code(code)
+        if split is not None:
+            parsed[code] = split
+    company_ids = await company_ids_for_acronyms(db, (acronym for acronym, _ in parsed.values()))
+    return {
+        code: VoucherKey(company_ids[acronym], suffix_int)
+        for code, (acronym, suffix_int) in parsed.items()
+        if acronym in company_ids
+    }
+
+async def resolve_voucher_code(db: AsyncSession, code: str) -> Optional[VoucherKey]:
+    return (await resolve_voucher_codes(db, [code])).get(code)
+
+def voucher_key_matches(key: VoucherKey, table=models.Voucher):
+    """WHERE criteria selecting the voucher at `key` in voucher or voucher_archive"""
+    return (
+        table.company_id == key.company_id,
+        table.suffix_int == key.suffix_int,
+    )
+
+def voucher_keys_in(keys: Iterable[VoucherKey], table=models.Voucher):
+    return tuple_(table.company_id, table.suffix_int).in_(list(keys))
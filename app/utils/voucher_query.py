@@ -0,0 +1,85 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import models
+from app.schemas import schemas
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+@dataclass
+class VoucherFilters:
+    """Voucher filters bound from query parameters and pushed into SQL"""
+    status: Optional[schemas.VoucherStatus] = None
+    used_by: Optional[UUID] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    used_from: Optional[datetime] = None
+    used_to: Optional[datetime] = None
+
+    def criteria(self, table=models.Voucher) -> List[ColumnElement[bool]]:
+        """The filters as WHERE criteria on `table` (Voucher or VoucherArchive)"""
+        criteria = []
+        if self.status is not None:
+            criteria.append(table.status == self.status.value)
+        if self.used_by is not None:
+            criteria.append(table.used_by == self.used_by)
+        if self.created_from is not None:
+            criteria.append(table.created_at >= self.created_from)
+        if self.created_to is not None:
+            criteria.append(table.created_at < self.created_to)
+        if self.used_from is not None:
+            criteria.append(table.used_at >= self.used_from)
+        if self.used_to is not None:
+            criteria.append(table.used_at < self.used_to)
+        return criteria
+
+    def apply(self, stmt: Select) -> Select:
+        return stmt.where(*self.criteria())
+
+def encode_cursor(created_at: datetime, voucher_key: Union[int, UUID]) -> str:
+    raw = f"{created_at.isoformat()}|{voucher_key}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Union[int, UUID]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, voucher_key = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), models.VOUCHER_KEY.type.python_type(voucher_key)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate_vouchers(
+    db: AsyncSession,
+    stmt: Select,
+    limit: int,
+    cursor: Optional[str] = None,
+    rows: bool = False
+) -> dict:
+    """
+    Fetch one page of vouchers in (created_at, VOUCHER_KEY) descending order.
+
+    Uses keyset pagination: the cursor holds the last row's sort key, so a
+    deep page is a single index range scan, just like the first page.
+
+    With `rows`, `stmt` is a column-only select that includes created_at and
+    VOUCHER_KEY, and the page holds its rows instead of ORM objects.
+    """
+    key = models.VOUCHER_KEY
+    if cursor:
+        created_at, voucher_key = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(models.Voucher.created_at, key) < tuple_(created_at, voucher_key))
+    stmt = stmt.order_by(models.Voucher.created_at.desc(), key.desc()).limit(limit + 1)
+    result = await db.execute(stmt)
+    vouchers = result.all() if rows else result.scalars().all()
+
+    next_cursor = None
+    if len(vouchers) > limit:
+        vouchers = vouchers[:limit]
+        next_cursor = encode_cursor(vouchers[-1].created_at, getattr(vouchers[-1], key.key))
+    return {"items": vouchers, "next_cursor": next_cursor}
@@ -0,0 +1,33 @@
+from typing import Dict, List, Sequence
+from sqlalchemy import Row, Select, select
+from app.models import models
+
+# Fields of schemas.Voucher, in its field order
+VOUCHER_ROW_COLUMNS = (
+    models.Voucher.company_id,
+    models.Voucher.id,
+    models.Voucher.code,
+    models.Voucher.status,
+    models.Voucher.used_by,
+    models.Voucher.used_at,
+    models.Voucher.created_by,
+    models.Voucher.created_at,
+    models.Voucher.batch_id,
+)
+VOUCHER_ROW_FIELDS = [column.key for column in VOUCHER_ROW_COLUMNS]
+
+def voucher_rows_select(*extra) -> Select:
+    """
+    Column-only select of the schemas.Voucher fields, plus any `extra`
+    columns (e.g. a sort key) after them.
+    """
+    return select(*VOUCHER_ROW_COLUMNS, *extra)
+
+def voucher_row_dicts(rows: Sequence[Row]) -> List[Dict]:
+    """
+    Voucher dicts for FastJSONResponse, skipping ORM and pydantic entirely.
+
+    Rows must start with VOUCHER_ROW_COLUMNS; trailing extra columns are dropped.
+    """
+    fields = VOUCHER_ROW_FIELDS
+    return [dict(zip(fields, row)) for row in rows]
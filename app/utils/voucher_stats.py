@@ -0,0 +1,35 @@
+from sqlalchemy import func
+from app.models import models
+
+def status_count_columns():
+    """
+    Per-status voucher totals summed from the maintained voucher_counters rows.
+
+    Each company has at most one counter row per status, so this is constant
+    work per company however many vouchers it has. Sums are coalesced so an
+    outer join from a company with no vouchers yields zeros.
+    """
+    count = models.VoucherCounter.count
+    status = models.VoucherCounter.status
+    return (
+        func.coalesce(func.sum(count), 0).label("total"),
+        func.coalesce(func.sum(count).filter(status == "active"), 0).label("active"),
+        func.coalesce(func.sum(count).filter(status == "used"), 0).label("used"),
+        func.coalesce(func.sum(count).filter(status == "invalid"), 0).label("invalid"),
+    )
+
+def voucher_count_columns(status=models.Voucher.status):
+    """
+    Per-status counts computed from voucher rows themselves in one pass
+    with COUNT(...) FILTER; for subsets the counters don't cover, e.g. a batch.
+    `status` may be the status column of a union of live and archived rows.
+    """
+    return (
+        func.count().label("total"),
+        func.count().filter(status == "active").label("active"),
+        func.count().filter(status == "used").label("used"),
+        func.count().filter(status == "invalid").label("invalid"),
+    )
+
+def usage_percentage(used: int, total: int) -> float:
+    return (used / total * 100) if total > 0 else 0
@@ -0,0 +1,90 @@
+"""Helpers shared by the load scripts; they only talk HTTP to a running server"""
+import argparse
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Collection, Dict, List
+
+import httpx
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--admin-email", required=True)
+    parser.add_argument("--admin-passcode", required=True)
+    parser.add_argument("--company-id", required=True, help="Company to issue benchmark vouchers for")
+    parser.add_argument("--codes", type=int, default=1000, help="Vouchers to create and verify")
+
+async def admin_headers(client: httpx.AsyncClient, email: str, passcode: str) -> Dict[str, str]:
+    response = await client.post("/api/v1/admin/login", json={"email": email, "passcode": passcode})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def create_codes(client: httpx.AsyncClient, headers: Dict[str, str], company_id: str, count: int) -> List[str]:
+    codes = []
+    while len(codes) < count:
+        response = await client.post(
+            "/api/v1/voucher/create",
+            json={"company_id": company_id, "count": min(count - len(codes), 5000)},
+            headers=headers
+        )
+        response.raise_for_status()
+        codes.extend(voucher["code"] for voucher in response.json())
+    return codes
+
+class Latencies:
+    """Request latencies and failures collected by a group of clients"""
+
+    def __init__(self):
+        self.seconds: List[float] = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def percentile(self, share: float) -> float:
+        ordered = sorted(self.seconds)
+        return ordered[max(math.ceil(share * len(ordered)) - 1, 0)] if ordered else float("nan")
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.seconds)} requests in {self.elapsed:.1f}s = {len(self.seconds) / self.elapsed:.0f} req/s, "
+            f"p50 {self.percentile(0.50) * 1000:.1f} ms, p99 {self.percentile(0.99) * 1000:.1f} ms, "
+            f"{self.errors} errors"
+        )
+
+async def run_clients(
+    clients: int,
+    duration: float,
+    send: Callable[[int], Awaitable[httpx.Response]],
+    expected_statuses: Collection[int] = (200,)
+) -> Latencies:
+    """Run `clients` loops calling send(request_number) back to back until `duration` elapses"""
+    latencies = Latencies()
+    started = time.perf_counter()
+    deadline = started + duration
+    sent = 0
+
+    async def client_loop():
+        nonlocal sent
+        while time.perf_counter() < deadline:
+            sent += 1
+            sent_at = time.perf_counter()
+            try:
+                response = await send(sent)
+            except httpx.HTTPError:
+                latencies.errors += 1
+                continue
+            if response.status_code in expected_statuses:
+                latencies.seconds.append(time.perf_counter() - sent_at)
+            else:
+                latencies.errors += 1
+
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    # Includes requests still in flight at the deadline
+    latencies.elapsed = time.perf_counter() - started
+    return latencies
+
+def http_client(base_url: str, connections: int) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=60,
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    )
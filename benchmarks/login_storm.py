@@ -0,0 +1,52 @@
+"""
+Latency of POST /api/v1/voucher/verify/{code} during a login storm.
+
+Measures verify latency twice for --duration seconds each: alone, then
+while --login-clients loops log the attendant in back to back, as at a
+shift change. Prints p50/p99 for both phases and the login rate.
+
+Usage:
+    python -m benchmarks.login_storm --admin-email admin@example.com \\
+        --admin-passcode secret --company-id <uuid> \\
+        --attendant-email till@example.com --attendant-passcode secret
+"""
+import argparse
+import asyncio
+import random
+
+from benchmarks.common import add_server_arguments, admin_headers, create_codes, http_client, run_clients
+
+async def main(args) -> None:
+    async with http_client(args.base_url, args.verify_clients + args.login_clients) as client:
+        headers = await admin_headers(client, args.admin_email, args.admin_passcode)
+        codes = await create_codes(client, headers, args.company_id, args.codes)
+        credentials = {"email": args.attendant_email, "passcode": args.attendant_passcode}
+
+        def verify(_):
+            return client.post(f"/api/v1/voucher/verify/{random.choice(codes)}")
+
+        def login(_):
+            return client.post("/api/v1/attendant/login", json=credentials)
+
+        await run_clients(args.verify_clients, args.warmup, verify)
+
+        quiet = await run_clients(args.verify_clients, args.duration, verify)
+        print(f"verify alone:              {quiet.summary()}")
+
+        during, logins = await asyncio.gather(
+            run_clients(args.verify_clients, args.duration, verify),
+            run_clients(args.login_clients, args.duration, login)
+        )
+        print(f"verify during login storm: {during.summary()}")
+        print(f"attendant logins:          {logins.summary()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure verify latency during a login storm")
+    add_server_arguments(parser)
+    parser.add_argument("--attendant-email", required=True)
+    parser.add_argument("--attendant-passcode", required=True)
+    parser.add_argument("--verify-clients", type=int, default=20)
+    parser.add_argument("--login-clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""
+Cost of encoding a large voucher list on the old and new response paths.
+
+Issues --codes vouchers (5000 by default) for the given company over HTTP,
+then, in process against the same database, loads them and times both
+paths --rounds times each:
+
+- old: ORM objects validated into schemas.Voucher (from_attributes) and
+  encoded by FastAPI's default JSONResponse, as a response_model route does
+- new: column rows turned into dicts by voucher_row_dicts and encoded by
+  FastJSONResponse (orjson)
+
+Prints p50/p99 for fetching, encoding and both together, and checks the
+two bodies decode to the same list.
+
+Run it with the server's DATABASE_URL in the environment.
+
+Usage:
+    python -m benchmarks.serialization --admin-email admin@example.com \\
+        --admin-passcode secret --company-id <uuid> [--codes 5000] [--rounds 20]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, engine
+from app.core.responses import FastJSONResponse
+from app.models import models
+from app.schemas import schemas
+from app.utils.voucher_rows import voucher_row_dicts, voucher_rows_select
+from benchmarks.common import Latencies, add_server_arguments, admin_headers, create_codes, http_client
+
+# How FastAPI validates and serializes a List[schemas.Voucher] response_model
+VOUCHER_LIST_FIELD = create_response_field(name="Response", type_=List[schemas.Voucher], mode="serialization")
+
+async def fetch_objects(company_id: str, count: int) -> list:
+    async with SessionLocal() as db:
+        return list(await db.scalars(
+            select(models.Voucher)
+            .where(models.Voucher.company_id == company_id)
+            .order_by(models.Voucher.created_at.desc())
+            .limit(count)
+        ))
+
+async def fetch_rows(company_id: str, count: int) -> list:
+    async with SessionLocal() as db:
+        return (await db.execute(
+            voucher_rows_select()
+            .where(models.Voucher.company_id == company_id)
+            .order_by(models.Voucher.created_at.desc())
+            .limit(count)
+        )).all()
+
+async def encode_objects(vouchers: list) -> bytes:
+    content = await serialize_response(field=VOUCHER_LIST_FIELD, response_content=vouchers)
+    return JSONResponse(content).body
+
+async def encode_rows(rows: list) -> bytes:
+    return FastJSONResponse(voucher_row_dicts(rows)).body
+
+async def timed(rounds: int, step) -> Latencies:
+    latencies = Latencies()
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await step()
+        latencies.seconds.append(time.perf_counter() - started)
+    return latencies
+
+def report(name: str, latencies: Latencies) -> str:
+    return f"{name:<18} p50 {latencies.percentile(0.50) * 1000:7.1f} ms, p99 {latencies.percentile(0.99) * 1000:7.1f} ms"
+
+async def main(args) -> None:
+    async with http_client(args.base_url, 1) as client:
+        headers = await admin_headers(client, args.admin_email, args.admin_passcode)
+        await create_codes(client, headers, args.company_id, args.codes)
+
+    objects = await fetch_objects(args.company_id, args.codes)
+    rows = await fetch_rows(args.company_id, args.codes)
+    old_body, new_body = await encode_objects(objects), await encode_rows(rows)
+    print(f"{len(rows)} vouchers, {len(old_body)} / {len(new_body)} bytes, same content: {json.loads(old_body) == json.loads(new_body)}")
+
+    paths = {
+        "old": (fetch_objects, encode_objects, objects),
+        "new": (fetch_rows, encode_rows, rows),
+    }
+    for name, (fetch, encode, loaded) in paths.items():
+        async def fetch_and_encode():
+            return await encode(await fetch(args.company_id, args.codes))
+
+        print(report(f"{name} fetch", await timed(args.rounds, lambda: fetch(args.company_id, args.codes))))
+        print(report(f"{name} encode", await timed(args.rounds, lambda: encode(loaded))))
+        print(report(f"{name} fetch+encode", await timed(args.rounds, fetch_and_encode)))
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare voucher list serialization paths")
+    add_server_arguments(parser)
+    parser.set_defaults(codes=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,45 @@
+"""
+Throughput of POST /api/v1/voucher/verify/{code} when most codes are guesses.
+
+Issues --codes vouchers for the given company, then runs --clients loops
+verifying codes of which --miss-rate are well-formed guesses under the
+company's acronym (404) and the rest real codes (200), as in a burst of
+guessed codes. Prints requests per second with p50 and p99 latency.
+
+Usage:
+    python -m benchmarks.verify_misses --admin-email admin@example.com \\
+        --admin-passcode secret --company-id <uuid> [--miss-rate 0.99]
+"""
+import argparse
+import asyncio
+import random
+
+from benchmarks.common import add_server_arguments, admin_headers, create_codes, http_client, run_clients
+
+SUFFIX_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+async def main(args) -> None:
+    async with http_client(args.base_url, args.clients) as client:
+        headers = await admin_headers(client, args.admin_email, args.admin_passcode)
+        codes = await create_codes(client, headers, args.company_id, args.codes)
+        acronym = codes[0].split("-")[0]
+
+        def guess():
+            return f"{acronym}-{''.join(random.choices(SUFFIX_ALPHABET, k=6))}"
+
+        def verify(_):
+            code = guess() if random.random() < args.miss_rate else random.choice(codes)
+            return client.post(f"/api/v1/voucher/verify/{code}")
+
+        await run_clients(args.clients, args.warmup, verify, expected_statuses=(200, 404))
+        latencies = await run_clients(args.clients, args.duration, verify, expected_statuses=(200, 404))
+    print(f"verify, {args.miss_rate:.0%} misses, {args.clients} clients: {latencies.summary()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure verify throughput on mostly guessed codes")
+    add_server_arguments(parser)
+    parser.add_argument("--miss-rate", type=float, default=0.99)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    asyncio.run(main(parser.parse_args()))
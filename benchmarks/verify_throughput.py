@@ -0,0 +1,36 @@
+"""
+Throughput of POST /api/v1/voucher/verify/{code} under concurrent clients.
+
+Issues --codes vouchers for the given company, then runs --clients loops
+verifying random codes back to back for --duration seconds and prints
+requests per second with p50 and p99 latency.
+
+Usage:
+    python -m benchmarks.verify_throughput --admin-email admin@example.com \\
+        --admin-passcode secret --company-id <uuid> [--clients 100] [--duration 20]
+"""
+import argparse
+import asyncio
+import random
+
+from benchmarks.common import add_server_arguments, admin_headers, create_codes, http_client, run_clients
+
+async def main(args) -> None:
+    async with http_client(args.base_url, args.clients) as client:
+        headers = await admin_headers(client, args.admin_email, args.admin_passcode)
+        codes = await create_codes(client, headers, args.company_id, args.codes)
+
+        def verify(_):
+            return client.post(f"/api/v1/voucher/verify/{random.choice(codes)}")
+
+        await run_clients(args.clients, args.warmup, verify)
+        latencies = await run_clients(args.clients, args.duration, verify)
+    print(f"verify, {args.clients} clients: {latencies.summary()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure verify throughput")
+    add_server_arguments(parser)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""
+Tests run against a real Postgres database named by TEST_DATABASE_URL,
+e.g. postgresql://postgres@localhost/voucher_test. Its public schema is
+dropped and recreated at the start of the run, so never point it at a
+database you care about. Without TEST_DATABASE_URL every test is skipped.
+"""
+import inspect
+import itertools
+import os
+import uuid
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# Settings are read at import time, so the environment is set up before
+# anything from app is imported
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+for name, value in {
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_DB": "voucher_test",
+    "DATABASE_URL": "postgresql://postgres@localhost/voucher_test",
+    "JWT_SECRET_KEY": "test-secret",
+    "BCRYPT_ROUNDS": "4",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(name, value)
+
+import httpx
+import pytest
+import sqlalchemy as sa
+
+from app.core.bloom import voucher_filter
+from app.core.cache import verify_cache
+from app.core.database import engine
+from app.core.security import admin_cache, pwd_context
+from app.main import app, lifespan
+from app.models import models
+from app.utils.voucher_generator import SUFFIX_WIDTH, encode_suffix
+from app.utils.voucher_lookup import company_cache
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSCODE = "admin-passcode"
+
+# Suffixes for codes inserted behind the app's back, counting down from the
+# largest plain suffix so they never collide with generated ones in practice
+_foreign_suffixes = itertools.count(36 ** SUFFIX_WIDTH - 1, -1)
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        item.add_marker(skip)
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Session-scoped so every test shares one event loop with the app's
+    # pooled connections and module-level locks
+    return "asyncio"
+
+@pytest.fixture(scope="session")
+def sync_engine():
+    engine = sa.create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(sa.text("DROP SCHEMA public CASCADE; CREATE SCHEMA public"))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="session")
+async def client(sync_engine):
+    async with lifespan(app):
+        async with httpx.AsyncClient(app=app, base_url="http://test", timeout=60) as client:
+            yield client
+
+@pytest.fixture(scope="session")
+async def admin_headers(client, sync_engine):
+    with sync_engine.begin() as conn:
+        conn.execute(sa.insert(models.Admin).values(
+            id=uuid.uuid4(), email=ADMIN_EMAIL, passcode=pwd_context.hash(ADMIN_PASSCODE)
+        ))
+    response = await client.post("/api/v1/admin/login", json={"email": ADMIN_EMAIL, "passcode": ADMIN_PASSCODE})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture(scope="session")
+async def company(client, admin_headers):
+    response = await client.post(
+        "/api/v1/company/create", json={"name": "Acme", "acronym": "acme"}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture(scope="session")
+def branch(sync_engine):
+    # Branches have no create endpoint
+    with sync_engine.begin() as conn:
+        branch_id = conn.execute(sa.insert(models.Branch).values(
+            id=uuid.uuid4(), name="Main", location="High Street"
+        ).returning(models.Branch.id)).scalar_one()
+    return {"id": str(branch_id)}
+
+@pytest.fixture(scope="session")
+async def attendant(client, admin_headers, branch):
+    response = await client.post(
+        "/api/v1/attendant/create",
+        json={"email": "till@example.com", "passcode": "till-passcode", "branch_id": branch["id"]},
+        headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def create_vouchers(client, admin_headers, company):
+    async def create(count: int = 1):
+        response = await client.post(
+            "/api/v1/voucher/create", json={"company_id": company["id"], "count": count}, headers=admin_headers
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+    return create
+
+@pytest.fixture
+def cold_caches():
+    """Empty the in-process caches, so requests pay for every lookup; call it to empty them again"""
+    def clear():
+        for cache in (admin_cache, verify_cache, company_cache):
+            cache.clear()
+    clear()
+    return clear
+
+@pytest.fixture
+async def foreign_voucher(sync_engine, company, admin_headers):
+    """
+    Create a voucher as another worker would: committed, but missing from
+    this worker's code filter until its next refresh
+    """
+    await voucher_filter.rebuild()
+    suffix_int = next(_foreign_suffixes)
+    voucher = {
+        "id": uuid.uuid4(),
+        "code": f"{company['acronym'].upper()}-{encode_suffix(suffix_int)}",
+        "company_id": uuid.UUID(company["id"]),
+        "suffix_int": suffix_int,
+    }
+    with sync_engine.begin() as conn:
+        created_by = conn.execute(sa.select(models.Admin.id).limit(1)).scalar_one()
+        conn.execute(sa.insert(models.Voucher).values(created_by=created_by, **voucher))
+    assert not await voucher_filter.might_contain(voucher["company_id"], suffix_int)
+    return voucher
+
+@pytest.fixture
+def connections_at_handoff(monkeypatch):
+    """
+    Patch handoffs (e.g. to a streaming export or a bulk job) to record how
+    many pooled connections are checked out when each one starts:
+
+        checked_out = connections_at_handoff(batch, "export_response")
+    """
+    checked_out = {}
+
+    def probe(module, name):
+        handoff = getattr(module, name)
+        if inspect.iscoroutinefunction(handoff):
+            async def wrapper(*args, **kwargs):
+                checked_out[name] = engine.pool.checkedout()
+                return await handoff(*args, **kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                checked_out[name] = engine.pool.checkedout()
+                return handoff(*args, **kwargs)
+        monkeypatch.setattr(module, name, wrapper)
+        return checked_out
+    return probe
@@ -0,0 +1,16 @@
+import logging
+
+import pytest
+
+from tests.conftest import ADMIN_EMAIL
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("email, passcode", [(ADMIN_EMAIL, "wrong"), ("nobody@example.com", "wrong")])
+async def test_rejected_login_is_a_quiet_401(client, admin_headers, caplog, email, passcode):
+    with caplog.at_level(logging.INFO):
+        response = await client.post("/api/v1/admin/login", json={"email": email, "passcode": passcode})
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid credentials"}
+    assert [record.message for record in caplog.records if record.levelno >= logging.ERROR] == []
@@ -0,0 +1,29 @@
+import pytest
+
+from app.api.v1.endpoints import batch
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("background", [False, True])
+async def test_handoffs_release_the_request_connection(client, admin_headers, create_vouchers, connections_at_handoff, cold_caches, background):
+    vouchers = await create_vouchers(2)
+    batch_id = vouchers[0]["batch_id"]
+    connections_at_handoff(batch, "export_response")
+    checked_out = connections_at_handoff(batch, "run_bulk_transition")
+
+    # Resolving the admin then takes the request session's connection
+    cold_caches()
+    response = await client.get(f"/api/v1/batch/{batch_id}/export", headers=admin_headers)
+    assert response.status_code == 200
+    assert all(voucher["code"] in response.text for voucher in vouchers)
+
+    cold_caches()
+    response = await client.post(
+        f"/api/v1/batch/{batch_id}/invalidate", params={"background": background}, headers=admin_headers
+    )
+    assert response.status_code == (202 if background else 200), response.text
+
+    assert checked_out == {"export_response": 0, "run_bulk_transition": 0}
+    for voucher in vouchers:
+        response = await client.get(f"/api/v1/voucher/{voucher['id']}", headers=admin_headers)
+        assert response.json()["status"] == "invalid"
@@ -0,0 +1,23 @@
+import pytest
+
+from app.api.v1.endpoints import voucher
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("background", [False, True])
+async def test_bulk_invalidate_releases_the_request_connection(client, admin_headers, create_vouchers, connections_at_handoff, cold_caches, background):
+    vouchers = await create_vouchers(3)
+    codes = [created["code"] for created in vouchers]
+    checked_out = connections_at_handoff(voucher, "run_bulk_transition")
+    # Resolving the admin then takes the request session's connection
+    cold_caches()
+
+    response = await client.post(
+        "/api/v1/voucher/invalidate/bulk", params={"background": background}, json={"codes": codes}, headers=admin_headers
+    )
+    assert response.status_code == (202 if background else 200), response.text
+    assert checked_out == {"run_bulk_transition": 0}
+
+    for code in codes:
+        response = await client.post(f"/api/v1/voucher/verify/{code}")
+        assert response.json()["status"] == "invalid"
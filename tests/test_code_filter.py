@@ -0,0 +1,34 @@
+"""A code missing from this worker's filter must still verify and redeem"""
+import pytest
+
+from app.core.bloom import voucher_filter
+from app.core.cache import verify_cache
+
+pytestmark = pytest.mark.anyio
+
+async def test_verify_answers_filter_misses_from_the_database(client, foreign_voucher, cold_caches):
+    response = await client.post(f"/api/v1/voucher/verify/{foreign_voucher['code']}")
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "active"
+    # Found codes are added, so the next lookup is a hit
+    assert await voucher_filter.might_contain(foreign_voucher["company_id"], foreign_voucher["suffix_int"])
+
+async def test_verify_keeps_guesses_out_of_the_cache(client, company, cold_caches):
+    await voucher_filter.rebuild()
+    code = f"{company['acronym'].upper()}-000000"
+    response = await client.post(f"/api/v1/voucher/verify/{code}")
+    assert response.status_code == 404
+    assert len(verify_cache) == 0
+
+async def test_use_redeems_filter_misses(client, attendant, foreign_voucher):
+    response = await client.post(
+        f"/api/v1/voucher/use/{foreign_voucher['code']}", json={"attendant_id": attendant["id"]}
+    )
+    assert response.status_code == 200, response.text
+
+async def test_batch_redeems_filter_misses(client, attendant, foreign_voucher):
+    response = await client.post("/api/v1/voucher/use/batch", json={"redemptions": [
+        {"code": foreign_voucher["code"], "attendant_id": attendant["id"]}
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["summary"] == {"used": 1}
@@ -0,0 +1,32 @@
+import asyncio
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENT_TILLS = 20
+
+async def test_parallel_use_redeems_once(client, attendant, create_vouchers):
+    [voucher] = await create_vouchers(1)
+
+    responses = await asyncio.gather(*(
+        client.post(f"/api/v1/voucher/use/{voucher['code']}", json={"attendant_id": attendant["id"]})
+        for _ in range(CONCURRENT_TILLS)
+    ))
+
+    succeeded = [response for response in responses if response.status_code == 200]
+    rejected = [response for response in responses if response.status_code != 200]
+    assert len(succeeded) == 1
+    assert len(rejected) == CONCURRENT_TILLS - 1
+    for response in rejected:
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Voucher is used"}
+
+async def test_parallel_use_of_different_codes_all_succeed(client, attendant, create_vouchers):
+    vouchers = await create_vouchers(CONCURRENT_TILLS)
+
+    responses = await asyncio.gather(*(
+        client.post(f"/api/v1/voucher/use/{voucher['code']}", json={"attendant_id": attendant["id"]})
+        for voucher in vouchers
+    ))
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_TILLS
@@ -0,0 +1,36 @@
+import pytest
+
+from app.api.v1.endpoints import voucher
+from app.utils.voucher_archive import archive_vouchers
+
+pytestmark = pytest.mark.anyio
+
+async def test_export_releases_the_request_connection(client, admin_headers, company, create_vouchers, connections_at_handoff, cold_caches):
+    [created] = await create_vouchers(1)
+    checked_out = connections_at_handoff(voucher, "export_response")
+    # Resolving the admin then takes the request session's connection
+    cold_caches()
+
+    response = await client.get("/api/v1/voucher/export", params={"company_id": company["id"]}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert created["code"] in response.text
+    assert checked_out == {"export_response": 0}
+
+async def test_exports_include_archived_vouchers(client, admin_headers, company, create_vouchers):
+    archived, live = await create_vouchers(2)
+    response = await client.post(f"/api/v1/voucher/invalidate/{archived['code']}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert await archive_vouchers(cutoff_days=0) >= 1
+
+    response = await client.get(
+        "/api/v1/voucher/export", params={"company_id": company["id"], "status": "invalid"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert archived["code"] in response.text
+    assert live["code"] not in response.text
+
+    response = await client.get(f"/api/v1/batch/{archived['batch_id']}/export", params={"format": "csv"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert archived["code"] in response.text
+    assert live["code"] in response.text
@@ -0,0 +1,24 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def test_cursor_pages_cover_every_voucher_once(client, admin_headers, company, create_vouchers):
+    created = {voucher["id"] for voucher in await create_vouchers(5)}
+
+    seen = []
+    params = {"company_id": company["id"], "limit": 2}
+    while True:
+        response = await client.get("/api/v1/voucher/", params=params, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen.extend(voucher["id"] for voucher in page["items"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+
+async def test_malformed_cursor_is_rejected(client, admin_headers):
+    response = await client.get("/api/v1/voucher/", params={"cursor": "bm90LWEtY3Vyc29y"}, headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,74 @@
+"""
+Drive the budgeted routes with QUERY_BUDGETS_ENFORCED on and every cache
+cold, so a route that goes over its query_budget raises
+QueryBudgetExceeded out of the client call.
+"""
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import sqlalchemy as sa
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import voucher_filter
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.query_counter import QueryBudgetExceeded, count_queries, query_budget
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def enforced_budgets(monkeypatch, cold_caches):
+    monkeypatch.setattr(settings, "QUERY_BUDGETS_ENFORCED", True)
+
+async def test_voucher_routes_within_budget(client, admin_headers, company, attendant, create_vouchers, cold_caches):
+    vouchers = await create_vouchers(5)
+    codes = [voucher["code"] for voucher in vouchers]
+    now = datetime.now(timezone.utc)
+    report_range = {"company_id": company["id"], "start": (now - timedelta(days=1)).isoformat()}
+
+    steps = [
+        ("verify", lambda: client.post(f"/api/v1/voucher/verify/{codes[0]}"), 200),
+        ("use", lambda: client.post(f"/api/v1/voucher/use/{codes[0]}", json={"attendant_id": attendant["id"]}), 200),
+        ("use again", lambda: client.post(f"/api/v1/voucher/use/{codes[0]}", json={"attendant_id": attendant["id"]}), 400),
+        ("use batch", lambda: client.post("/api/v1/voucher/use/batch", json={"redemptions": [
+            {"code": code, "attendant_id": attendant["id"]} for code in codes[1:3] + ["NOPE-000000"]
+        ]}), 200),
+        ("revert", lambda: client.post(f"/api/v1/voucher/revert/{codes[0]}", headers=admin_headers), 200),
+        ("get", lambda: client.get(f"/api/v1/voucher/{vouchers[3]['id']}", headers=admin_headers), 200),
+        ("list", lambda: client.get("/api/v1/voucher/", params={"company_id": company["id"], "limit": 2}, headers=admin_headers), 200),
+        ("company list", lambda: client.get(f"/api/v1/company/{company['id']}/vouchers", headers=admin_headers), 200),
+        ("redemptions report", lambda: client.get("/api/v1/reports/redemptions", params=report_range, headers=admin_headers), 200),
+        ("top branches report", lambda: client.get("/api/v1/reports/top-branches", params=report_range, headers=admin_headers), 200),
+    ]
+    for name, send, expected_status in steps:
+        cold_caches()
+        response = await send()
+        assert response.status_code == expected_status, f"{name}: {response.text}"
+
+async def test_verify_budget_excludes_bloom_refresh(client, foreign_voucher, cold_caches):
+    voucher_filter._last_refresh = 0
+
+    # Cold company cache plus the refresh the filter miss starts: the miss is
+    # answered from the database, and only the company lookup and voucher
+    # query count against the request
+    with count_queries() as counter:
+        response = await client.post(f"/api/v1/voucher/verify/{foreign_voucher['code']}")
+    assert response.status_code == 200, response.text
+    assert counter.count == 2, counter.report()
+
+    await voucher_filter._refresh_task
+    assert await voucher_filter.might_contain(foreign_voucher["company_id"], foreign_voucher["suffix_int"])
+
+async def test_budget_exceeded_raises_out_of_the_app():
+    app = FastAPI()
+
+    @app.get("/", dependencies=[Depends(query_budget(0))])
+    async def one_statement(db: AsyncSession = Depends(get_db)):
+        return {"now": await db.scalar(select(sa.func.now()))}
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        with pytest.raises(QueryBudgetExceeded, match="1 SQL statements run, budget is 0"):
+            await client.get("/")
@@ -0,0 +1,181 @@
+"""
+EXPLAIN every statement the voucher, company, batch, attendant and report
+routes send on a seeded dataset, and fail on any sequential scan of the
+large tables. enable_seqscan stays on, so this checks that the planner
+chooses the indexes rather than that it can be forced onto them.
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.models import models
+
+pytestmark = pytest.mark.anyio
+
+# Tables that grow with traffic. Branch, company, admin, voucher_batch and
+# voucher_counters stay small enough that a sequential scan is the right plan.
+LARGE_TABLES = {"voucher", "voucher_archive", "attendant", "redemption_rollup"}
+
+SEED_COMPANIES = 20
+SEED_VOUCHERS_PER_COMPANY = 5000
+SEED_ARCHIVED_PER_COMPANY = 2500
+SEED_BRANCHES = 50
+SEED_ATTENDANTS = 2000
+SEED_ROLLUP_DAYS = 30
+
+SEED_SQL = f"""
+INSERT INTO branch (id, name, location)
+SELECT gen_random_uuid(), 'Seed branch ' || b, 'Seed'
+FROM generate_series(1, {SEED_BRANCHES}) AS b;
+
+INSERT INTO attendant (id, email, passcode, branch_id, created_by)
+SELECT gen_random_uuid(), 'seed' || a || '@example.com', 'x',
+       (SELECT id FROM branch ORDER BY id OFFSET a % {SEED_BRANCHES} LIMIT 1),
+       (SELECT id FROM admin LIMIT 1)
+FROM generate_series(1, {SEED_ATTENDANTS}) AS a;
+
+INSERT INTO company (id, name, acronym, code_scheme)
+SELECT gen_random_uuid(), 'Seed company ' || c, 'SEED' || c, 'plain'
+FROM generate_series(1, {SEED_COMPANIES}) AS c;
+
+CREATE TEMPORARY TABLE seed_attendant AS
+SELECT row_number() OVER (ORDER BY id) AS n, id, branch_id FROM attendant;
+
+INSERT INTO voucher_batch (id, company_id, size, created_by)
+SELECT gen_random_uuid(), company.id, {SEED_VOUCHERS_PER_COMPANY}, (SELECT id FROM admin LIMIT 1)
+FROM company WHERE acronym LIKE 'SEED%';
+
+INSERT INTO voucher (id, code, company_id, suffix_int, status, used_by, used_at, created_by, created_at, batch_id)
+SELECT gen_random_uuid(), company.acronym || '-' || lpad(v::text, 6, '0'), company.id, v,
+       seeded.status, CASE WHEN seeded.status = 'used' THEN seed_attendant.id END,
+       CASE WHEN seeded.status = 'used' THEN seeded.created_at + interval '1 hour' END,
+       voucher_batch.created_by, seeded.created_at, voucher_batch.id
+FROM company
+JOIN voucher_batch ON voucher_batch.company_id = company.id
+CROSS JOIN generate_series(1, {SEED_VOUCHERS_PER_COMPANY}) AS v
+CROSS JOIN LATERAL (SELECT
+    (ARRAY['active', 'active', 'used', 'invalid'])[1 + v % 4]::voucher_status AS status,
+    now() - (v % 60) * interval '1 day' AS created_at
+) AS seeded
+JOIN seed_attendant ON seed_attendant.n = 1 + v % {SEED_ATTENDANTS}
+WHERE company.acronym LIKE 'SEED%';
+
+INSERT INTO voucher_archive (id, code, company_id, suffix_int, status, used_by, used_at, created_by, created_at)
+SELECT gen_random_uuid(),
+       company.acronym || '-' || lpad(v::text, 6, '0'), company.id, v,
+       'used', seed_attendant.id, now() - interval '200 days',
+       (SELECT id FROM admin LIMIT 1), now() - interval '201 days'
+FROM company
+CROSS JOIN generate_series({SEED_VOUCHERS_PER_COMPANY} + 1,
+                           {SEED_VOUCHERS_PER_COMPANY + SEED_ARCHIVED_PER_COMPANY}) AS v
+JOIN seed_attendant ON seed_attendant.n = 1 + v % {SEED_ATTENDANTS}
+WHERE company.acronym LIKE 'SEED%';
+
+INSERT INTO redemption_rollup (company_id, hour, branch_id, attendant_id, count)
+SELECT company.id, date_trunc('hour', now()) - h * interval '1 hour',
+       seed_attendant.branch_id, seed_attendant.id, 1 + h % 5
+FROM company
+CROSS JOIN generate_series(0, {SEED_ROLLUP_DAYS * 24}) AS h
+JOIN seed_attendant ON seed_attendant.n = 1 + h % {SEED_ATTENDANTS}
+WHERE company.acronym LIKE 'SEED%';
+
+DROP TABLE seed_attendant;
+"""
+
+@pytest.fixture(scope="module")
+def seeded(sync_engine, admin_headers):
+    with sync_engine.begin() as conn:
+        conn.execute(sa.text(SEED_SQL))
+    with sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+@contextmanager
+def captured_statements():
+    """Collect (statement, parameters) for everything sent through the app's engine"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+def sequential_scans(plan):
+    """Relation names of every Seq Scan node in a JSON plan tree"""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from sequential_scans(child)
+
+async def explain(statement, parameters):
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()
+        await conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+async def assert_no_large_table_seq_scans(statements):
+    explained = 0
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+            continue
+        scanned = LARGE_TABLES.intersection(sequential_scans(await explain(statement, parameters)))
+        assert not scanned, f"Seq Scan on {sorted(scanned)}:\n{' '.join(statement.split())}"
+        explained += 1
+    assert explained, "no statements were captured"
+
+async def test_routes_use_indexes(client, seeded, admin_headers, company, attendant, branch, create_vouchers, cold_caches):
+    vouchers = await create_vouchers(6)
+    codes = [voucher["code"] for voucher in vouchers]
+    batch_id = vouchers[0]["batch_id"]
+    now = datetime.now(timezone.utc)
+    redemption_window = {"start": (now - timedelta(days=7)).isoformat(), "end": (now + timedelta(hours=1)).isoformat()}
+
+    with captured_statements() as statements:
+        requests = [
+            client.post(f"/api/v1/voucher/verify/{codes[0]}"),
+            client.post(f"/api/v1/voucher/use/{codes[0]}", json={"attendant_id": attendant["id"]}),
+            client.post("/api/v1/voucher/use/batch", json={"redemptions": [
+                {"code": code, "attendant_id": attendant["id"]} for code in codes[1:4]
+            ] + [{"code": "SEED1-000003", "attendant_id": attendant["id"]}]}),
+            client.post(f"/api/v1/voucher/revert/{codes[1]}", headers=admin_headers),
+            client.get(f"/api/v1/voucher/{vouchers[4]['id']}", headers=admin_headers),
+            client.get("/api/v1/voucher/", params={"company_id": company["id"], "limit": 2}, headers=admin_headers),
+            client.get("/api/v1/voucher/", params={"company_id": company["id"], "status": "active"}, headers=admin_headers),
+            client.get("/api/v1/voucher/", params={"used_by": attendant["id"]}, headers=admin_headers),
+            client.get(f"/api/v1/company/{company['id']}/vouchers", params={"limit": 2}, headers=admin_headers),
+            client.get(f"/api/v1/company/{company['id']}/stats", headers=admin_headers),
+            client.get(f"/api/v1/voucher/company/{company['id']}/stats", headers=admin_headers),
+            client.get(f"/api/v1/batch/{batch_id}/stats", headers=admin_headers),
+            client.get(f"/api/v1/attendant/branch/{branch['id']}", headers=admin_headers),
+            client.get(f"/api/v1/attendant/{attendant['id']}", headers=admin_headers),
+            client.get("/api/v1/reports/redemptions", params={"company_id": company["id"], **redemption_window}, headers=admin_headers),
+            client.get("/api/v1/reports/top-branches", params={"company_id": company["id"], **redemption_window}, headers=admin_headers),
+        ]
+        for request in requests:
+            response = await request
+            assert response.status_code == 200, response.text
+
+        # Follow a list cursor so keyset continuation is covered too
+        first_page = (await client.get(
+            "/api/v1/voucher/", params={"company_id": company["id"], "limit": 2}, headers=admin_headers
+        )).json()
+        response = await client.get(
+            "/api/v1/voucher/",
+            params={"company_id": company["id"], "limit": 2, "cursor": first_page["next_cursor"]},
+            headers=admin_headers
+        )
+        assert response.status_code == 200, response.text
+
+    await assert_no_large_table_seq_scans(statements)
@@ -0,0 +1,45 @@
+import uuid
+
+import pytest
+import sqlalchemy as sa
+
+from app.models import models
+
+pytestmark = pytest.mark.anyio
+
+async def test_revert_decrements_the_branch_recorded_at_redemption(client, admin_headers, sync_engine, create_vouchers):
+    with sync_engine.begin() as conn:
+        first, second = conn.execute(sa.insert(models.Branch).returning(models.Branch.id), [
+            {"id": uuid.uuid4(), "name": "Before", "location": "North"},
+            {"id": uuid.uuid4(), "name": "After", "location": "South"},
+        ]).scalars().all()
+    response = await client.post(
+        "/api/v1/attendant/create",
+        json={"email": "mover@example.com", "passcode": "mover-passcode", "branch_id": str(first)},
+        headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    attendant_id = response.json()["id"]
+
+    single, bulk = (voucher["code"] for voucher in await create_vouchers(2))
+    response = await client.post(f"/api/v1/voucher/use/{single}", json={"attendant_id": attendant_id})
+    assert response.status_code == 200, response.text
+    response = await client.post("/api/v1/voucher/use/batch", json={"redemptions": [{"code": bulk, "attendant_id": attendant_id}]})
+    assert response.json()["summary"] == {"used": 1}
+
+    # Transferred before the redemptions are reverted
+    with sync_engine.begin() as conn:
+        conn.execute(sa.update(models.Attendant).where(models.Attendant.id == attendant_id).values(branch_id=second))
+
+    response = await client.post(f"/api/v1/voucher/revert/{single}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    response = await client.post("/api/v1/voucher/revert/bulk", json={"codes": [bulk]}, headers=admin_headers)
+    assert response.json()["affected"] == 1, response.text
+
+    with sync_engine.connect() as conn:
+        counts = dict(conn.execute(
+            sa.select(models.RedemptionRollup.branch_id, sa.func.sum(models.RedemptionRollup.count))
+            .where(models.RedemptionRollup.attendant_id == attendant_id)
+            .group_by(models.RedemptionRollup.branch_id)
+        ).all())
+    assert counts == {first: 0}
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+def timestamp(value: str) -> datetime:
+    # Responses end UTC times in "Z", which fromisoformat only accepts from Python 3.11
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+async def test_scanned_at_is_clamped_to_the_vouchers_lifetime(client, admin_headers, attendant, create_vouchers):
+    ahead, behind, honest = await create_vouchers(3)
+    sent_at = datetime.now(timezone.utc)
+    scanned = {
+        ahead["code"]: sent_at + timedelta(days=1),
+        behind["code"]: datetime(2000, 1, 1, tzinfo=timezone.utc),
+        honest["code"]: sent_at,
+    }
+
+    response = await client.post("/api/v1/voucher/use/batch", json={"redemptions": [
+        {"code": code, "attendant_id": attendant["id"], "scanned_at": scanned_at.isoformat()}
+        for code, scanned_at in scanned.items()
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["summary"] == {"used": 3}
+    received_at = datetime.now(timezone.utc)
+
+    used_at = {}
+    for voucher in (ahead, behind, honest):
+        response = await client.get(f"/api/v1/voucher/{voucher['id']}", headers=admin_headers)
+        used_at[voucher["code"]] = timestamp(response.json()["used_at"])
+
+    assert sent_at <= used_at[ahead["code"]] <= received_at
+    assert used_at[behind["code"]] == timestamp(behind["created_at"])
+    assert used_at[honest["code"]] == scanned[honest["code"]]
+
+async def test_scanned_at_accepts_a_z_suffix(client, admin_headers, attendant, create_vouchers):
+    [voucher] = await create_vouchers(1)
+    scanned_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+    response = await client.post("/api/v1/voucher/use/batch", json={"redemptions": [
+        {"code": voucher["code"], "attendant_id": attendant["id"], "scanned_at": scanned_at.strftime("%Y-%m-%dT%H:%M:%SZ")}
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["summary"] == {"used": 1}
+
+    response = await client.get(f"/api/v1/voucher/{voucher['id']}", headers=admin_headers)
+    assert timestamp(response.json()["used_at"]) == max(scanned_at, timestamp(voucher["created_at"]))
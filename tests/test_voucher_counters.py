@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models import models
+from app.utils.voucher_counters import reconcile_counters
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def rolled_back_session(client):
+    """A session whose commits are savepoints inside a transaction rolled back afterwards"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        async with AsyncSession(bind=conn, join_transaction_mode="create_savepoint") as db:
+            yield db
+        await transaction.rollback()
+
+async def test_reconcile_with_no_vouchers_clears_stale_counters(rolled_back_session, company):
+    db = rolled_back_session
+    await db.execute(delete(models.Voucher))
+    await db.execute(delete(models.VoucherArchive))
+    await db.execute(delete(models.VoucherCounter))
+    await db.execute(insert(models.VoucherCounter).values(company_id=company["id"], status="active", count=3))
+
+    drift = await reconcile_counters(db)
+
+    assert [(row["status"], row["stored"], row["actual"]) for row in drift] == [("active", 3, 0)]
+    assert (await db.execute(select(models.VoucherCounter))).all() == []